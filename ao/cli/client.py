@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#
+#  file:    client.py
+#  description:
+#    Functions to run a command line tool in a service (see service.py)
+#    instead of the current process.
+#
+#    The service is used if the environment variable AO_SERVICE contains the
+#    path of its socket. A request consists of a json header line with the
+#    command, its arguments and the working directory followed by frames:
+#
+#      [channel: 1 byte] [length: 4 bytes] [data]
+#
+#    channels: "i" stdin (client -> service), "o" stdout, "e" stderr and
+#    "x" exit status (service -> client).
+# ------------------------------------------------------------------------------
+
+import os
+import sys
+import json
+import struct
+
+HEADER = struct.Struct(">cI")
+
+# ------------------------------------------------------------------------------
+def send_frame(connection, channel, data):
+    """Send a frame over a connection"""
+    connection.sendall( HEADER.pack( channel, len(data) ) + data )
+
+# ------------------------------------------------------------------------------
+def recv_frame(stream):
+    """Receive a frame from a (buffered) stream (None at the end of the stream)"""
+
+    header = stream.read( HEADER.size )
+    if len(header) < HEADER.size:
+        return None
+
+    channel, length = HEADER.unpack( header )
+    data = stream.read( length )
+    if len(data) < length:
+        return None
+
+    return channel, data
+
+# ------------------------------------------------------------------------------
+def forward(command, argv=None):
+    """Run a command in the service and exit with its status
+
+    Returns False if no service is available (the command should be run in
+    the current process).
+    """
+
+    address = os.environ.get( "AO_SERVICE" )
+    if not address:
+        return False
+
+    import socket
+
+    try:
+        connection = socket.socket( socket.AF_UNIX, socket.SOCK_STREAM )
+        connection.connect( address )
+    except OSError:
+        return False
+
+    with connection:
+        # request
+        header = { "command": command, "argv": sys.argv[1:] if argv is None else argv, "cwd": os.getcwd() }
+        connection.sendall( json.dumps( header ).encode("utf-8") + b"\n" )
+
+        data = b"" if sys.stdin is None or sys.stdin.isatty() else sys.stdin.buffer.read()
+        send_frame( connection, b"i", data )
+
+        # response
+        status = 1
+        stream = connection.makefile( "rb" )
+        while True:
+            frame = recv_frame( stream )
+            if frame is None:
+                break
+
+            channel, data = frame
+            if channel == b"o":
+                sys.stdout.buffer.write( data )
+            elif channel == b"e":
+                sys.stderr.buffer.write( data )
+            elif channel == b"x":
+                status = struct.unpack( ">i", data )[0]
+                break
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+    sys.exit( status )
@@ -12,33 +12,179 @@
 #    - reads a VNF descriptor from stdin
 #    - creates an internal model of the VNF
 #    - maps the contents of the model into a template and
-#    - writes the results to stdout.
+#    - writes the results to stdout (or splits them into files).
 # ------------------------------------------------------------------------------
 
 from argparse         import ArgumentParser
 from logging          import info, error, basicConfig, ERROR, WARNING, INFO, DEBUG
+from ao.model         import backend, serialize
 from ao.model.input   import Input
 from ao.model.model   import Model
 from ao.model.render  import Render
-from sys              import stderr, exit
-from os               import path
+from ao.model.output  import Output
+from ao.cli.client    import forward
+from sys              import exit
+from os               import path, environ, makedirs, replace, getpid
+from hashlib          import sha256
+from functools        import lru_cache
+from collections      import OrderedDict
+import sys
 
 # ------------------------------------------------------------------------------
 # schema version
 # ------------------------------------------------------------------------------
 VERSION = "V0.1.1"
 
+# ------------------------------------------------------------------------------
+# templates rendered by the bundle "all"
+# ------------------------------------------------------------------------------
+TEMPLATES = [
+    "canonical",
+    "deployment",
+    "deployment_playbook",
+    "deployment_variables",
+    "playbook_parameters",
+    "playbook_cluster_parameters"
+]
+
+# ------------------------------------------------------------------------------
+# recently built models kept in memory (by a long running service)
+# ------------------------------------------------------------------------------
+MODELS     = OrderedDict()
+MODELS_MAX = 16
+SERVICE    = False  # set by the service
+
+# ------------------------------------------------------------------------------
+# version of the code building models (part of the keys of cached models)
+# ------------------------------------------------------------------------------
+@lru_cache(maxsize=None)
+def model_version():
+    digest = sha256()
+    for module in [Model.__module__, serialize.__name__]:
+        try:
+            with open(sys.modules[module].__file__, "rb") as stream:
+                digest.update(stream.read())
+        except (OSError, TypeError):
+            digest.update(module.encode("utf-8"))
+    return digest.hexdigest()
+
+# ------------------------------------------------------------------------------
+# build
+# ------------------------------------------------------------------------------
+def build(raw, context, cache_dir=None):
+    """Provide the model of a descriptor (from the caches if it has been built before)"""
+
+    # key: descriptor bytes, schema version, context, model format and model code
+    key = sha256()
+    for part in [VERSION, context, str(serialize.FORMAT), model_version()]:
+        key.update(part.encode("utf-8") + b"\0")
+    key.update(raw)
+    key = key.hexdigest()
+
+    if key in MODELS:
+        MODELS.move_to_end(key)
+        return MODELS[key]
+
+    model = None
+    if cache_dir:
+        filename = path.join(cache_dir, key + ".model")
+        try:
+            model = serialize.restore(filename)
+            info("Model loaded from cache: {}".format(filename))
+        except FileNotFoundError:
+            pass
+        except Exception as exc:
+            # the invalid entry is replaced by the model built below
+            info("Invalid cached model {}: {}".format(filename, exc))
+
+    # build the model
+    if model is None:
+        model = Model(context=context)
+        model.set(backend.load(raw))
+
+        # store the model (atomically since other runs may read it)
+        if cache_dir:
+            try:
+                makedirs(cache_dir, exist_ok=True)
+                temp = "{}.{}.tmp".format(filename, getpid())
+                serialize.save(model, temp)
+                replace(temp, filename)
+            except OSError as exc:
+                info("Unable to cache model: {}".format(exc))
+
+    MODELS[key] = model
+    while len(MODELS) > MODELS_MAX:
+        MODELS.popitem(last=False)
+
+    return model
+
+# ------------------------------------------------------------------------------
+# get_renderer
+# ------------------------------------------------------------------------------
+@lru_cache(maxsize=None)
+def get_renderer(version, directory, cache):
+    """Provide a renderer (shared by all runs of a long running service)"""
+    return Render(version=version, directory=directory, cache=cache)
+
+# ------------------------------------------------------------------------------
+# generate
+# ------------------------------------------------------------------------------
+def generate(renderer, data, template_names, threads=1, datas={}):
+    """Provide the results of the templates as a stream of text chunks
+
+    datas provides other data than the model for individual templates.
+    """
+
+    # render in parallel threads (results are complete strings) or piece by piece
+    if threads > 1 and len(template_names) > 1:
+        names    = [ name for name in template_names if not name in datas ]
+        rendered = dict( renderer.render_many(data, names, threads) )
+        results  = [ (name, [rendered[name]] if name in rendered else renderer.generate(datas[name], name))
+                     for name in template_names ]
+    else:
+        results = ( (name, renderer.generate(datas.get(name, data), name)) for name in template_names )
+
+    for template_name, chunks in results:
+        # separate the results of several templates: ">> [filename]"
+        head = ""
+        for chunk in chunks:
+            if head is not None:
+                head += chunk
+                if len(head) < 2:
+                    continue
+                if len(template_names) > 1 and not head.startswith(">>"):
+                    yield ">> {}.yaml\n".format(template_name)
+                chunk, head = head, None
+            yield chunk
+
+        if head is not None:
+            if len(template_names) > 1 and not head.startswith(">>"):
+                yield ">> {}.yaml\n".format(template_name)
+            yield head
+
+        yield "\n"
+
 # ------------------------------------------------------------------------------
 # main
 # ------------------------------------------------------------------------------
 def main():
+    # run in a service if one is available
+    forward("generator")
+
     # setup command line parser
     parser = ArgumentParser(
         prog='generator.py',
         description='Generate information from a VNF descriptor',
     )
 
-    parser.add_argument('-t', '--template', type=str,  default="canonical", help='name of the template')
+    parser.add_argument('-t', '--template', type=str,  nargs='+', default=["canonical"], help='names of the templates or "all" ("delta" and "action" require a store)')
+    parser.add_argument('-c', '--context', type=str, default="default", help='context of the model')
+    parser.add_argument('-C', '--cache-dir', type=str, default=None, help='directory caching the models of descriptors')
+    parser.add_argument('-s', '--store', type=str, default=None, help='file storing the versions of the model')
+    parser.add_argument('-o', '--output', type=str, default=None, help='directory into which the ">> [path]" parts are written')
+    parser.add_argument('-u', '--update', action='store_true', help='replace output files atomically and only if their content has changed')
+    parser.add_argument('-T', '--threads', type=int, default=1, help='number of threads rendering the templates')
+    parser.add_argument('-y', '--yaml', type=str, default="auto", choices=backend.BACKENDS, help='yaml implementation')
     parser.add_argument('-v', '--verbose', action='count', default=0, help='set logging level: -v, -vv, -vvv')
 
     args = parser.parse_args()
@@ -47,38 +193,111 @@ def main():
     loglevel = args.verbose
     levels   = [ERROR, WARNING, INFO, DEBUG]
     level    = levels[min(len(levels)-1,loglevel)]  # capped to number of levels
-    basicConfig(level=level,
+    basicConfig(level=level, force=True,
                 format='%(asctime)-15s %(levelname)5s %(filename)s:%(funcName)s:%(lineno)s %(message)s')
 
+    # setup yaml implementation
+    try:
+        backend.set_backend(args.yaml)
+    except ImportError as exc:
+        error("{}".format(exc))
+        exit( 3 )
+
     # setup generator
     module_dir = path.dirname(__file__)
     tmpl_dir   = path.join(module_dir, "..", "data", "templates")
-    renderer   = Render(version=VERSION, directory=tmpl_dir)
+    cache_dir  = path.join(environ.get("XDG_CACHE_HOME", path.expanduser("~/.cache")), "ao", "templates")
+    renderer   = get_renderer(VERSION, tmpl_dir, cache_dir)
 
-    # retrieve descriptor from stdin
-    try:
-        reader     = Input()
-        descriptor = reader.read()
-    except KeyboardInterrupt:
-        error("Keyboard interrupt")
+    # check if the output directory exists
+    if args.output is not None and not path.isdir(args.output):
+        error("Invalid path")
         exit( 1 )
 
-    # create internal model
-    model = Model()
-    model.set(descriptor)
+    # create the model of a descriptor from stdin
+    datas = {}
+    if not args.store and not args.cache_dir and not SERVICE:
+        try:
+            reader     = Input(keep=False)
+            descriptor = reader.read()
+        except KeyboardInterrupt:
+            error("Keyboard interrupt")
+            exit( 1 )
+
+        if descriptor is None:
+            error("Invalid descriptor")
+            exit( 1 )
+
+        model = Model(context=args.context)
+        model.set(descriptor)
+
+    # create the model from the raw descriptor (cached or built from scratch)
+    elif not args.store:
+        try:
+            raw   = sys.stdin.buffer.read()
+            model = build(raw, args.context, args.cache_dir)
+        except KeyboardInterrupt:
+            error("Keyboard interrupt")
+            exit( 1 )
+        except Exception as exc:
+            error("Invalid descriptor: {}".format(exc))
+            exit( 1 )
+
+    # continue with the latest stored version of the model
+    else:
+        from ao.model.store  import Store
+        from ao.model.delta  import Delta
+        from ao.model.action import Action
+
+        try:
+            reader     = Input(keep=False)
+            descriptor = reader.read()
+        except KeyboardInterrupt:
+            error("Keyboard interrupt")
+            exit( 1 )
+
+        store    = Store(args.store)
+        model    = store.load(args.context)
+        previous = model.getModel()["version"] if model else None
+        if model is None:
+            model = Model(context=args.context)
+
+        model.set(descriptor)
+        store.save(model)
+
+        # difference to the previous version
+        if "delta" in args.template or "action" in args.template:
+            if previous is None:
+                delta = Delta(Model(context=args.context), model)
+            else:
+                delta = store.delta(model, previous)
+
+            datas["delta"]  = delta.getModel()
+            datas["action"] = Action(delta).getModel()
+
+        store.close()
+
     data = model.getModel()
 
-    # render model
+    # render model and write the results while they are produced
     try:
-        template_name = args.template
+        template_names = []
+        for template_name in args.template:
+            template_names.extend(TEMPLATES if template_name == "all" else [template_name])
 
-        result = renderer.render(data=data, template_name=template_name)
+        chunks = generate(renderer, data, template_names, threads=args.threads, datas=datas)
+
+        if args.output is None:
+            sys.stdout.writelines(chunks)
+        else:
+            output = Output(directory=args.output, update=args.update, threads=args.threads)
+            output.write(chunks)
+
+            info("{} files written, {} files unchanged".format(output.getWritten(), output.getSkipped()))
     except Exception as exc:
         error("Error while rendering:{}".format(exc))
         exit(2)
 
-    print(result)
-
 # ----- MAIN -------------------------------------------------------------------
 
 if __name__ == '__main__':
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#
+#  file:    service.py
+#  description:
+#    This script runs the command line tools (generator, validator and
+#    splitter) in a long running process which keeps the templates, schemas
+#    and recently built models in memory.
+#
+#    The tools use the service if the environment variable AO_SERVICE
+#    contains the path of its socket, e.g.:
+#
+#      service -s /tmp/ao.sock &
+#      export AO_SERVICE=/tmp/ao.sock
+#      generator -t all < descriptor.yaml
+#
+#    Requests are served one after the other.
+# ------------------------------------------------------------------------------
+
+from argparse         import ArgumentParser
+from logging          import info, error, basicConfig, getLogger, ERROR, WARNING, INFO, DEBUG
+from importlib        import import_module
+from socketserver     import UnixStreamServer, StreamRequestHandler
+from traceback        import print_exc
+from tempfile         import gettempdir
+from ao.cli.client    import send_frame, recv_frame
+from sys              import exit
+from os               import path, environ, getcwd, chdir, chmod, remove, getuid
+import io
+import sys
+import json
+import struct
+
+COMMANDS = ["generator", "validator", "splitter"]
+
+# ------------------------------------------------------------------------------
+#
+# Class Channel: raw stream writing frames to a connection
+#
+# ------------------------------------------------------------------------------
+class Channel(io.RawIOBase):
+
+    # --------------------------------------------------------------------------
+    def __init__(self, connection, channel):
+        """Initialize"""
+
+        self.connection = connection
+        self.channel    = channel
+
+    # --------------------------------------------------------------------------
+    def writable(self):
+        return True
+
+    # --------------------------------------------------------------------------
+    def write(self, data):
+        """Send data as a frame"""
+
+        send_frame( self.connection, self.channel, bytes(data) )
+        return len(data)
+
+# ------------------------------------------------------------------------------
+#
+# Class Handler: runs a command line tool for a client
+#
+# ------------------------------------------------------------------------------
+class Handler(StreamRequestHandler):
+
+    # --------------------------------------------------------------------------
+    def handle(self):
+        """Serve a request"""
+
+        try:
+            header = json.loads( self.rfile.readline() )
+            frame  = recv_frame( self.rfile )
+        except ValueError:
+            return
+
+        if frame is None or not header.get("command") in COMMANDS:
+            error("Invalid request")
+            return
+
+        info("{} {}".format(header["command"], " ".join(header["argv"])))
+
+        status = run( header["command"], header["argv"], header["cwd"], frame[1], self.connection )
+
+        send_frame( self.connection, b"x", struct.pack( ">i", status ) )
+
+# ------------------------------------------------------------------------------
+# run
+# ------------------------------------------------------------------------------
+def run(command, argv, cwd, data, connection):
+    """Run a command line tool with redirected standard streams"""
+
+    saved  = ( sys.argv, sys.stdin, sys.stdout, sys.stderr, getcwd() )
+    root   = getLogger()
+    logger = ( root.handlers[:], root.level )
+    status = 0
+
+    sys.argv   = [ command ] + argv
+    sys.stdin  = io.TextIOWrapper( io.BytesIO( data ), encoding="utf-8" )
+    sys.stdout = io.TextIOWrapper( io.BufferedWriter( Channel( connection, b"o" ) ), encoding="utf-8" )
+    sys.stderr = io.TextIOWrapper( io.BufferedWriter( Channel( connection, b"e" ) ), encoding="utf-8",
+                                   line_buffering=True )
+
+    try:
+        chdir( cwd )
+        import_module( "ao.cli." + command ).main()
+    except SystemExit as exc:
+        if exc.code is None or isinstance( exc.code, int ):
+            status = exc.code or 0
+        else:
+            print( exc.code, file=sys.stderr )
+            status = 1
+    except BaseException:
+        print_exc()
+        status = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        except OSError:
+            pass
+
+        sys.argv, sys.stdin, sys.stdout, sys.stderr, directory = saved
+        root.handlers[:] = logger[0]
+        root.setLevel( logger[1] )
+        chdir( directory )
+
+    return status
+
+# ------------------------------------------------------------------------------
+# main
+# ------------------------------------------------------------------------------
+def main():
+    # setup command line parser
+    parser = ArgumentParser(
+        prog='service.py',
+        description='Run the command line tools in a long running process',
+    )
+
+    default = path.join(environ.get("XDG_RUNTIME_DIR", gettempdir()), "ao-{}.sock".format(getuid()))
+
+    parser.add_argument('-s', '--socket', type=str, default=default, help='path of the socket')
+    parser.add_argument('-m', '--models', type=int, default=16, help='number of models kept in memory')
+    parser.add_argument('-v', '--verbose', action='count', default=0, help='set logging level: -v, -vv, -vvv')
+
+    args = parser.parse_args()
+
+    # setup logging
+    loglevel = args.verbose
+    levels   = [ERROR, WARNING, INFO, DEBUG]
+    level    = levels[min(len(levels)-1,loglevel)]  # capped to number of levels
+    basicConfig(level=level,
+                format='%(asctime)-15s %(levelname)5s %(filename)s:%(funcName)s:%(lineno)s %(message)s')
+
+    # the tools must not forward requests to the service itself
+    environ.pop("AO_SERVICE", None)
+
+    # setup model cache
+    generator            = import_module("ao.cli.generator")
+    generator.MODELS_MAX = args.models
+    generator.SERVICE    = True
+
+    # remove the socket of a previous service
+    if path.exists(args.socket):
+        remove(args.socket)
+
+    try:
+        with UnixStreamServer(args.socket, Handler) as server:
+            chmod(args.socket, 0o600)
+            info("Listening on {}".format(args.socket))
+            server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    except OSError as exc:
+        error("Unable to run service: {}".format(exc))
+        exit( 1 )
+    finally:
+        if path.exists(args.socket):
+            remove(args.socket)
+
+# ----- MAIN -------------------------------------------------------------------
+
+if __name__ == '__main__':
+    main()
@@ -15,15 +15,32 @@
 
 from argparse         import ArgumentParser
 from logging          import info, error, basicConfig, ERROR, WARNING, INFO, DEBUG
-from ao.model.input   import Input
 from ao.model.output  import Output
+from ao.cli.client    import forward
 from sys              import exit
 from os               import getcwd, path
+from io               import StringIO
+import sys
+
+# ------------------------------------------------------------------------------
+# echo
+# ------------------------------------------------------------------------------
+def echo(stream):
+    """Pass on the lines of a stream and copy them to stdout"""
+
+    for line in stream:
+        sys.stdout.write(line)
+        yield line
+
+    sys.stdout.write("\n")
 
 # ------------------------------------------------------------------------------
 # main
 # ------------------------------------------------------------------------------
 def main():
+    # run in a service if one is available
+    forward("splitter")
+
     # setup command line parser
     parser = ArgumentParser(
         prog='splitter.py',
@@ -31,6 +48,8 @@ def main():
     )
 
     parser.add_argument('-p', '--path', type=str,  default="", help='path to which the output should be sent')
+    parser.add_argument('-u', '--update', action='store_true', help='replace files atomically and only if their content has changed')
+    parser.add_argument('-T', '--threads', type=int, default=1, help='number of threads replacing updated files')
     parser.add_argument('-v', '--verbose', action='count', default=0, help='set logging level: -v, -vv, -vvv')
 
     args = parser.parse_args()
@@ -39,7 +58,7 @@ def main():
     loglevel = args.verbose
     levels   = [ERROR, WARNING, INFO, DEBUG]
     level    = levels[min(len(levels)-1,loglevel)]  # capped to number of levels
-    basicConfig(level=level,
+    basicConfig(level=level, force=True,
                 format='%(asctime)-15s %(levelname)5s %(filename)s:%(funcName)s:%(lineno)s %(message)s')
 
     # setup splitter
@@ -59,20 +78,18 @@ def main():
         error("Invalid path")
         exit( 1 )
 
-    # retrieve data from stdin
+    # split data from stdin while it is read (blocks without a file are
+    # written after the echo of the data)
     try:
-        reader = Input()
-        data   = reader.read(yaml=False)
+        blocks = StringIO()
+        output = Output(directory=output_directory_name, update=args.update, threads=args.threads, stdout=blocks)
+        output.write(echo(sys.stdin))
+        sys.stdout.write(blocks.getvalue())
+
+        info("{} files written, {} files unchanged".format(output.getWritten(), output.getSkipped()))
     except KeyboardInterrupt:
         error("Keyboard interrupt")
         exit( 2 )
-
-    print(data)
-
-    # write data
-    try:
-        output = Output(directory=output_directory_name)
-        output.write(data)
     except Exception as exc:
         error("Unable to write data: {}".format(exc))
         exit( 3 )
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from os               import path, listdir, stat
+from tempfile         import TemporaryDirectory
+from ao.cli.generator import build, MODELS
+from ao.model         import serialize
+from unittest         import TestCase, expectedFailure
+from pytest           import mark
+
+class GeneratorTest(TestCase):
+    def setUp(self):
+        # models built by other tests must not be provided from memory
+        MODELS.clear()
+
+    @staticmethod
+    def read_bytes(filename):
+        filepath = path.join(path.dirname(__file__), '../../model/test/fixtures/{}.yaml'.format(filename))
+        with open(filepath, 'rb') as stream:
+            return stream.read()
+
+    def test__01__generator__model_cache__pass(self):
+        # prepare
+        raw = GeneratorTest.read_bytes("clearwater1")
+
+        # run - test should fail if any exception occurs
+        try:
+            with TemporaryDirectory() as directory:
+                model1 = build(raw, "test", directory)
+                files1 = listdir(directory)
+                stat1  = stat(path.join(directory, files1[0]))
+                model2 = build(raw, "test", directory)
+                MODELS.clear()
+                model3 = build(raw, "test", directory)
+                stat3  = stat(path.join(directory, files1[0]))
+                model4 = build(raw, "other", directory)
+                files4 = listdir(directory)
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check - the second model is provided from memory, the third from disk
+        self.assertEqual( len(files1), 1 )
+        self.assertEqual( len(files4), 2 )
+        self.assertIs( model2, model1 )
+        self.assertIsNot( model3, model1 )
+        self.assertEqual( model3.getModel(), model1.getModel() )
+        self.assertEqual( (stat3.st_ino, stat3.st_mtime_ns), (stat1.st_ino, stat1.st_mtime_ns) )
+        self.assertEqual( model4.getModel()["context"], "other" )
+
+    def test__02__generator__corrupt_model_cache__pass(self):
+        # prepare
+        raw = GeneratorTest.read_bytes("clearwater1")
+
+        # run - test should fail if any exception occurs
+        try:
+            with TemporaryDirectory() as directory:
+                model1   = build(raw, "test", directory)
+                filename = path.join(directory, listdir(directory)[0])
+
+                with open(filename, "r+b") as stream:
+                    stream.seek(-100, 2)
+                    stream.write(b"\xff" * 3)
+
+                MODELS.clear()
+                model2   = build(raw, "test", directory)
+
+                # valid data of an incomplete model
+                with open(filename, "wb") as stream:
+                    stream.write(serialize.dumps({ "schema": "V0.1.1", "context": "test" }))
+
+                MODELS.clear()
+                model3   = build(raw, "test", directory)
+                restored = serialize.restore(filename)
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check - the model is rebuilt and the cached file replaced
+        self.assertEqual( model2.getModel(), model1.getModel() )
+        self.assertEqual( model3.getModel(), model1.getModel() )
+        self.assertEqual( restored.getModel(), model1.getModel() )
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from os               import path, getcwd
+from tempfile         import TemporaryDirectory
+from threading        import Thread
+from socketserver     import UnixStreamServer
+from ao.cli.service   import Handler
+from ao.cli.client    import send_frame, recv_frame
+from ao.cli.generator import generate, get_renderer, build, VERSION, MODELS
+from ao.cli           import generator
+from unittest         import TestCase, expectedFailure
+from pytest           import mark
+import json
+import socket
+import struct
+
+class ServiceTest(TestCase):
+    def setUp(self):
+        # models built by other tests must not be provided from memory
+        MODELS.clear()
+        generator.SERVICE = True
+
+    def tearDown(self):
+        generator.SERVICE = False
+
+    @staticmethod
+    def read_bytes(filename):
+        filepath = path.join(path.dirname(__file__), '../../model/test/fixtures/{}.yaml'.format(filename))
+        with open(filepath, 'rb') as stream:
+            return stream.read()
+
+    @staticmethod
+    def request(address, command, argv, data):
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.connect(address)
+
+        with connection:
+            header = { "command": command, "argv": argv, "cwd": getcwd() }
+            connection.sendall(json.dumps(header).encode("utf-8") + b"\n")
+            send_frame(connection, b"i", data)
+
+            output = { b"o": b"", b"e": b"" }
+            stream = connection.makefile("rb")
+            while True:
+                channel, data = recv_frame(stream)
+                if channel == b"x":
+                    return struct.unpack(">i", data)[0], output[b"o"], output[b"e"]
+                output[channel] += data
+
+    def test__01__service__round_trip__pass(self):
+        # prepare
+        raw = ServiceTest.read_bytes("clearwater1")
+
+        # run - test should fail if any exception occurs
+        try:
+            with TemporaryDirectory() as directory:
+                address = path.join(directory, "ao.sock")
+                with UnixStreamServer(address, Handler) as server:
+                    thread = Thread(target=server.serve_forever)
+                    thread.start()
+
+                    try:
+                        result1 = ServiceTest.request(address, "generator", ["-t", "canonical"], raw)
+                        result2 = ServiceTest.request(address, "generator", ["-t", "canonical"], raw)
+                        result3 = ServiceTest.request(address, "generator", ["--unknown"], raw)
+                        result4 = ServiceTest.request(address, "generator", ["-t", "canonical"], b"a: [")
+                        models  = len(MODELS)
+                    finally:
+                        server.shutdown()
+                        thread.join()
+
+            renderer = get_renderer(VERSION, path.join(path.dirname(__file__), "..", "..", "data", "templates"), None)
+            expected = "".join(generate(renderer, build(raw, "default").getModel(), ["canonical"])).encode("utf-8")
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check
+        self.assertEqual( result1, (0, expected, b"") )
+        self.assertEqual( result2, (0, expected, b"") )
+        self.assertEqual( result3[0], 2 )
+        self.assertIn( b"unrecognized arguments", result3[2] )
+        self.assertEqual( models, 1 )
+        self.assertEqual( result4[0], 1 )
+        self.assertIn( b"Invalid descriptor", result4[2] )
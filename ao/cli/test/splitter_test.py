@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from os               import path, environ
+from subprocess       import run
+from sys              import executable
+from tempfile         import TemporaryDirectory
+from unittest         import TestCase, expectedFailure
+from pytest           import mark
+
+class SplitterTest(TestCase):
+    @staticmethod
+    def split(directory, data):
+        root = path.join(path.dirname(__file__), "..", "..", "..")
+        env  = dict(environ, PYTHONPATH=path.abspath(root))
+        env.pop("AO_SERVICE", None)
+
+        process = run([executable, "-m", "ao.cli.splitter", "-p", directory],
+                      input=data, env=env, capture_output=True, text=True, check=True)
+        return process.stdout
+
+    def test__01__splitter__stdout_order__pass(self):
+        # prepare
+        data = "hello\nworld\n>> a.txt\nA\n>> \nB\n"
+
+        # run - test should fail if any exception occurs
+        try:
+            with TemporaryDirectory() as directory:
+                output = SplitterTest.split(directory, data)
+
+                with open(path.join(directory, "a.txt")) as stream:
+                    content = stream.read()
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check - the echo of the data precedes the blocks without a file
+        self.assertEqual( output, data + "\n" + "hello\nworld\nB\n" )
+        self.assertEqual( content, "A" )
@@ -13,27 +13,49 @@
 # ------------------------------------------------------------------------------
 
 from argparse          import ArgumentParser
+from glob              import glob
+from json              import dumps
+from time              import perf_counter
 from logging           import info, error, basicConfig, ERROR, WARNING, INFO, DEBUG
+from ao.model          import backend
 from ao.model.input    import Input
 from ao.model.validate import Validate
-from sys               import stderr, exit
-from os                import path
+from ao.cli.client     import forward
+from sys               import exit
+from os                import path, environ, cpu_count
+from functools         import lru_cache
 
 # ------------------------------------------------------------------------------
 # schema version
 # ------------------------------------------------------------------------------
 VERSION = "V0.1.1"
 
+# ------------------------------------------------------------------------------
+# get_validator
+# ------------------------------------------------------------------------------
+@lru_cache(maxsize=None)
+def get_validator(version, directory, cache, results):
+    """Provide a validator (shared by all runs of a long running service)"""
+    return Validate(version=version, directory=directory, cache=cache, results=results)
+
 # ------------------------------------------------------------------------------
 # main
 # ------------------------------------------------------------------------------
 def main():
+    # run in a service if one is available
+    forward("validator")
+
     # setup command line parser
     parser = ArgumentParser(
         prog='validator.py',
         description='Validate a VNF descriptor',
     )
 
+    parser.add_argument('files', nargs='*', help='descriptor files or glob patterns (default: read from stdin)')
+    parser.add_argument('-c', '--cache-dir', type=str, default=None, help='directory for cached schemas and validation results')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='number of worker processes (0: number of CPUs)')
+    parser.add_argument('-m', '--max-errors', type=int, default=None, help='stop after this number of errors (0: only check validity)')
+    parser.add_argument('-y', '--yaml', type=str, default="auto", choices=backend.BACKENDS, help='yaml implementation')
     parser.add_argument('-v', '--verbose', action='count', default=0, help='set logging level: -v, -vv, -vvv')
 
     args = parser.parse_args()
@@ -42,24 +64,52 @@ def main():
     loglevel = args.verbose
     levels   = [ERROR, WARNING, INFO, DEBUG]
     level    = levels[min(len(levels)-1,loglevel)]  # capped to number of levels
-    basicConfig(level=level,
+    basicConfig(level=level, force=True,
                 format='%(asctime)-15s %(levelname)5s %(filename)s:%(funcName)s:%(lineno)s %(message)s')
 
+    # setup yaml implementation
+    try:
+        backend.set_backend(args.yaml)
+    except ImportError as exc:
+        error("{}".format(exc))
+        exit( 3 )
+
     # setup validator
     module_dir = path.dirname(__file__)
     schema_dir = path.join(module_dir, "..", "data", "schemas")
-    validator  = Validate(version=VERSION, directory=schema_dir)
+    cache_dir  = path.join(environ.get("XDG_CACHE_HOME", path.expanduser("~/.cache")), "ao")
+    results    = None
+    if args.cache_dir:
+        cache_dir = args.cache_dir
+        results   = path.join(cache_dir, "results-{}.db".format(VERSION))
+    validator  = get_validator(VERSION, schema_dir, path.join(cache_dir, "schemas"), results)
+    jobs       = args.jobs if args.jobs > 0 else cpu_count()
+
+    # validate files in batch mode
+    if args.files:
+        try:
+            batch(validator, args.files, jobs, args.max_errors)
+        except KeyboardInterrupt:
+            error("Keyboard interrupt")
+            exit( 1 )
+        return
 
     # retrieve descriptor from stdin
     try:
-        reader     = Input()
+        reader     = Input(keep=False)
         descriptor = reader.read()
     except KeyboardInterrupt:
         error("Keyboard interrupt")
         exit( 1 )
 
+    # check validity only
+    if args.max_errors == 0:
+        if not validator.is_valid(descriptor):
+            exit( 2 )
+        return
+
     # validate
-    issues = validator.validate(descriptor)
+    issues = validator.validate(descriptor, jobs=jobs, max_errors=args.max_errors)
 
     # check for issues
     if issues:
@@ -69,6 +119,37 @@ def main():
 
         exit( 2 )
 
+# ------------------------------------------------------------------------------
+# batch
+# ------------------------------------------------------------------------------
+def batch(validator, patterns, jobs, max_errors):
+    # determine files
+    filenames = []
+    for pattern in patterns:
+        matches = sorted(glob(pattern, recursive=True))
+        filenames.extend(matches if matches else [pattern])
+
+    # validate files (distributed over the worker processes)
+    start   = perf_counter()
+    results = validator.validate_files(filenames, jobs=jobs, max_errors=max_errors)
+
+    for result in results:
+        info("{}: {} ({} errors)".format(result["file"], result["status"], result["errors"]))
+
+    # write summary
+    summary = {
+        "files":   results,
+        "total":   len(results),
+        "valid":   sum(1 for result in results if result["status"] == "valid"),
+        "invalid": sum(1 for result in results if result["status"] != "valid"),
+        "seconds": round(perf_counter() - start, 6)
+    }
+
+    print(dumps(summary, indent=2))
+
+    if summary["invalid"]:
+        exit( 2 )
+
 # ----- MAIN -------------------------------------------------------------------
 
 if __name__ == '__main__':
@@ -7,12 +7,24 @@
 #
 # A class to calculate actions from a delta (difference between models).
 #
+# The actions form a directed acyclic graph:
+# - containers are added before and removed after their content,
+#   changed containers are updated after their content,
+# - networks are added/changed before the components and nodes attached to
+#   them and removed after the components and nodes detached from them,
+# - providers of services are added/changed before their dependents and
+#   removed after them or after the dependents dropping them (dependency
+#   cycles are not ordered),
+# - removals precede additions of the same type within a container (unless
+#   the removal has to wait for one of the additions).
+#
+# Actions without an order between them are grouped into waves which can be
+# executed in parallel. The waves are executed one after the other.
+#
 # ------------------------------------------------------------------------------
 
 # TODO:
 # - validate arguments (type, if consistent, ...)
-# - proper sequence of adding/removing networks
-# - handling dependencies of elements with endpoints
 # - adding config data to actions
 
 # ------------------------------------------------------------------------------
@@ -36,64 +48,251 @@ class Action():
             "context":    delta.model["context"],
             "version1":   delta.model["version1"],
             "version2":   delta.model["version2"],
-            "actions":    []
+            "actions":    [],
+            "waves":      []
         }
 
-        actions = self.model["actions"]
-
-        # handle internal components
-        for vnf in self.delta["vnfs"]:
-            for tenant in vnf["tenants"]:
-
-                # remove all obsolete components
-                for component in tenant["components"]:
-                    if component["action"] == "remove":
-                        for node in component["nodes"]:
-                            actions.append( node )
-                        actions.append( component )
-
-                # change all modified nodes of unmodified components
-                for component in tenant["components"]:
-                    if component["action"] == "keep":
-                        for node in component["nodes"]:
-                            if node["action"] != "keep":
-                                actions.append( node )
-
-                # change all modified components
-                for component in tenant["components"]:
-                    if component["action"] == "change":
-                        for node in component["nodes"]:
-                            if node["action"] != "keep":
-                                actions.append( node )
-                        actions.append( component )
-
-                # add all new components
-                for component in tenant["components"]:
-                    if component["action"] == "add":
-                        actions.append( component )
-                        for node in component["nodes"]:
-                            actions.append( node )
-
-        # handle internal networks
-        for vnf in self.delta["vnfs"]:
-            for tenant in vnf["tenants"]:
-
-                # remove all obsolete components
-                for network in tenant["networks"]:
-                    if network["action"] == "remove":
-                        actions.append( network )
-
-                # change all modified components
-                for component in tenant["components"]:
-                    if network["action"] == "change":
-                        actions.append( network )
-
-                # add all new components
-                for component in tenant["components"]:
-                    if network["action"] == "add":
-                        actions.append( network )
+        # actions: (type, fqn) -> action, parents: (type, fqn) -> container
+        self.actions = {}
+        self.parents = {}
+        self._collect( self.delta["components"], None )
+        self._collect( self.delta["vnfs"],       None )
+
+        # dependencies between the actions: key -> keys of the predecessors
+        self.graph = { key: set() for key in self.actions }
+        self._add_containment_dependencies()
+        self._add_network_dependencies()
+        self._add_service_dependencies()
+        self._add_removal_dependencies()
+
+        # group the actions into waves
+        for index, keys in enumerate( self._get_waves() ):
+            wave = []
+            for key in keys:
+                action         = self.actions[key]
+                action["wave"] = index
+                wave.append( action )
+
+            self.model["waves"].append( wave )
+            self.model["actions"].extend( wave )
 
     # --------------------------------------------------------------------------
     def getModel(self):
         """Provide model object"""
         return self.model
+
+    # --------------------------------------------------------------------------
+    def getWaves(self):
+        """Provide the actions grouped into waves"""
+        return self.model["waves"]
+
+    # --------------------------------------------------------------------------
+    def _collect(self, entities, parent):
+        # all entities of the delta which need to be acted upon
+        for entity in entities:
+            key = (entity["type"], entity["fqn"])
+
+            if entity["action"] != "keep":
+                self.actions[key] = { "type": entity["type"], "fqn": entity["fqn"], "action": entity["action"] }
+
+            self.parents[key] = parent
+
+            for listname in ["tenants","networks","components","nodes"]:
+                self._collect( entity.get(listname, []), key )
+
+    # --------------------------------------------------------------------------
+    def _add_containment_dependencies(self):
+        for key, parent in self.parents.items():
+            if not key in self.actions or not parent in self.actions:
+                continue
+
+            # new containers are created before their content, all
+            # other containers are handled after their content
+            if self.actions[parent]["action"] == "add":
+                self.graph[key].add( parent )
+            else:
+                self.graph[parent].add( key )
+
+    # --------------------------------------------------------------------------
+    def _add_network_dependencies(self):
+        for key, action in self.actions.items():
+            if not key[0] in ["ExternalComponent","InternalComponent","Node"]:
+                continue
+
+            # removed and changed entities detach from the networks of the old model
+            for network in self._get_networks( self.index1.get(key) ):
+                other = self.actions.get( ("Network", network) )
+                if other and other["action"] == "remove":
+                    self.graph[("Network", network)].add( key )
+
+            # new and changed entities attach to the networks of the new model
+            if action["action"] != "remove":
+                for network in self._get_networks( self.index2.get(key) ):
+                    other = self.actions.get( ("Network", network) )
+                    if other and other["action"] != "remove":
+                        self.graph[key].add( ("Network", network) )
+
+    # --------------------------------------------------------------------------
+    def _add_removal_dependencies(self):
+        # removals and additions of the same type within the same container
+        groups = {}
+        for key, action in self.actions.items():
+            if action["action"] in ["add","remove"]:
+                group = groups.setdefault( (self.parents[key], key[0]), { "add": [], "remove": [] } )
+                group[action["action"]].append( key )
+
+        # all removals precede all additions (via a barrier without action)
+        # except additions which the removals have to wait for
+        for (parent, type), group in groups.items():
+            if group["add"] and group["remove"]:
+                ancestors = self._get_ancestors( group["remove"] )
+                additions = [ key for key in group["add"] if not key in ancestors ]
+                if not additions:
+                    continue
+
+                barrier = ("Barrier", parent, type)
+                self.graph[barrier] = set( group["remove"] )
+                for key in additions:
+                    self.graph[key].add( barrier )
+
+    # --------------------------------------------------------------------------
+    def _add_service_dependencies(self):
+        edges = {}
+
+        for key, action in self.actions.items():
+            if not key[0] in ["ExternalComponent","InternalComponent"]:
+                continue
+
+            # dependents are removed or drop a provider before it is removed
+            for provider in self._get_providers( self.index1.get(key) ):
+                other = self.actions.get( provider )
+                if other and other["action"] == "remove" and provider != key:
+                    edges.setdefault( provider, set() ).add( key )
+
+            # providers are added or changed before their dependents
+            if action["action"] != "remove":
+                for provider in self._get_providers( self.index2.get(key) ):
+                    other = self.actions.get( provider )
+                    if other and other["action"] != "remove" and provider != key:
+                        edges.setdefault( key, set() ).add( provider )
+
+        # components depending on each other can not be ordered
+        cycles = self._get_cycles( edges )
+
+        for key, predecessors in edges.items():
+            for predecessor in predecessors:
+                if cycles[key] != cycles[predecessor]:
+                    self.graph[key].add( predecessor )
+
+    # --------------------------------------------------------------------------
+    def _get_ancestors(self, keys):
+        # all actions which have to precede the given actions
+        ancestors = set()
+        stack     = list( keys )
+        while stack:
+            for predecessor in self.graph[ stack.pop() ]:
+                if not predecessor in ancestors:
+                    ancestors.add( predecessor )
+                    stack.append( predecessor )
+
+        return ancestors
+
+    # --------------------------------------------------------------------------
+    def _get_networks(self, entity):
+        networks = []
+
+        if entity:
+            for listname in ["interfaces","services","dependencies"]:
+                for entry in entity.get(listname, []):
+                    if "network" in entry:
+                        networks.append( entry["network"] )
+
+        return networks
+
+    # --------------------------------------------------------------------------
+    def _get_providers(self, entity):
+        providers = []
+
+        if entity:
+            for dependency in entity.get("dependencies", []):
+                # service: [component fqn]/[service name]
+                component = dependency["service"].rsplit("/", 1)[0]
+                for type in ["InternalComponent","ExternalComponent"]:
+                    if (type, component) in self.actions:
+                        providers.append( (type, component) )
+
+        return providers
+
+    # --------------------------------------------------------------------------
+    def _get_cycles(self, edges):
+        # strongly connected components (iterative Tarjan): key -> number
+        numbers = {}
+        lowlink = {}
+        cycles  = {}
+        stack   = []
+        counter = 0
+
+        for root in list( edges ):
+            if root in numbers:
+                continue
+
+            path = [ (root, iter( edges.get(root, ()) )) ]
+            numbers[root] = lowlink[root] = counter
+            counter += 1
+            stack.append( root )
+
+            while path:
+                key, successors = path[-1]
+                for successor in successors:
+                    if not successor in numbers:
+                        numbers[successor] = lowlink[successor] = counter
+                        counter += 1
+                        stack.append( successor )
+                        path.append( (successor, iter( edges.get(successor, ()) )) )
+                        break
+                    if not successor in cycles:
+                        lowlink[key] = min( lowlink[key], numbers[successor] )
+                else:
+                    path.pop()
+                    if path:
+                        lowlink[path[-1][0]] = min( lowlink[path[-1][0]], lowlink[key] )
+
+                    # key is the root of a strongly connected component
+                    if lowlink[key] == numbers[key]:
+                        while True:
+                            member = stack.pop()
+                            cycles[member] = numbers[key]
+                            if member == key:
+                                break
+
+        return cycles
+
+    # --------------------------------------------------------------------------
+    def _get_waves(self):
+        # longest path layering of the graph (barriers do not add a wave)
+        successors = { key: [] for key in self.graph }
+        pending    = {}
+        for key, predecessors in self.graph.items():
+            pending[key] = len( predecessors )
+            for predecessor in predecessors:
+                successors[predecessor].append( key )
+
+        levels = { key: 0 for key in self.graph }
+        ready  = [ key for key in self.graph if pending[key] == 0 ]
+        while ready:
+            key   = ready.pop()
+            level = levels[key] + ( key[0] != "Barrier" )
+            for successor in successors[key]:
+                levels[successor] = max( levels[successor], level )
+                pending[successor] -= 1
+                if pending[successor] == 0:
+                    ready.append( successor )
+
+        # waves contain the actions in the sequence of the delta
+        waves = []
+        for key in self.actions:
+            while len( waves ) <= levels[key]:
+                waves.append( [] )
+            waves[ levels[key] ].append( key )
+
+        return waves
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#
+# backend.py:
+#
+# Functions to load and dump yaml data with the fastest available yaml
+# implementation: the libyaml based C loader/dumper if PyYAML has been built
+# with it and the pure python implementation otherwise.
+#
+# The implementation can be forced with set_backend() or the environment
+# variable AO_YAML_BACKEND ("auto", "libyaml" or "python"). PyYAML is only
+# imported when yaml data is loaded or dumped.
+#
+# ------------------------------------------------------------------------------
+
+import os
+
+BACKENDS = ["auto", "libyaml", "python"]
+
+# ------------------------------------------------------------------------------
+#
+# Dumpers which never emit aliases and represent named tuples as mappings
+# (created when yaml is loaded for the first time)
+#
+# ------------------------------------------------------------------------------
+_dumpers = None
+
+def _represent_tuple(dumper, data):
+    if hasattr(data, "_asdict"):
+        return dumper.represent_dict( data._asdict() )
+    return dumper.represent_list( data )
+
+def _get_dumpers():
+    global _dumpers
+
+    if _dumpers is None:
+        import yaml
+
+        class PythonDumper(yaml.SafeDumper):
+
+            def ignore_aliases(self, data):
+                return True
+
+        if yaml.__with_libyaml__:
+            class LibyamlDumper(yaml.CSafeDumper):
+
+                def ignore_aliases(self, data):
+                    return True
+        else:
+            LibyamlDumper = None
+
+        for dumper in [PythonDumper, LibyamlDumper]:
+            if dumper:
+                dumper.add_multi_representer( tuple, _represent_tuple )
+
+        _dumpers = { "python": PythonDumper, "libyaml": LibyamlDumper }
+
+    return _dumpers
+
+# ------------------------------------------------------------------------------
+# current backend (yaml is imported when it is used for the first time)
+# ------------------------------------------------------------------------------
+_requested = "auto"
+_backend   = None
+_loader    = None
+_dumper    = None
+
+# ------------------------------------------------------------------------------
+def set_backend(name="auto"):
+    """Select the yaml implementation"""
+    global _requested, _backend
+
+    if not name in BACKENDS:
+        raise AttributeError( "Unsupported yaml backend" )
+
+    # only an explicitly requested libyaml needs to be checked right away
+    if name == "libyaml":
+        import yaml
+        if not yaml.__with_libyaml__:
+            raise ImportError( "libyaml is not available" )
+
+    _requested = name
+    _backend   = None
+
+# ------------------------------------------------------------------------------
+def _setup():
+    """Load the selected yaml implementation"""
+    global _backend, _loader, _dumper
+
+    import yaml
+
+    name = _requested
+    if name == "auto":
+        name = "libyaml" if yaml.__with_libyaml__ else "python"
+
+    if name == "libyaml":
+        _loader = yaml.CSafeLoader
+    else:
+        _loader = yaml.SafeLoader
+
+    _dumper  = _get_dumpers()[name]
+    _backend = name
+
+# ------------------------------------------------------------------------------
+def get_backend():
+    """Provide the name of the selected yaml implementation"""
+
+    if _backend is None:
+        _setup()
+    return _backend
+
+# ------------------------------------------------------------------------------
+def load(stream):
+    """Load yaml data from a string or stream"""
+    import yaml
+
+    if _backend is None:
+        _setup()
+    return yaml.load( stream, Loader=_loader )
+
+# ------------------------------------------------------------------------------
+def dump(data, stream=None, **kwargs):
+    """Dump data as yaml to a string or stream"""
+    import yaml
+
+    if _backend is None:
+        _setup()
+    return yaml.dump( data, stream, Dumper=_dumper, **kwargs )
+
+# ------------------------------------------------------------------------------
+
+set_backend( os.environ.get( "AO_YAML_BACKEND", "auto" ) )
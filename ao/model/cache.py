@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#
+# cache.py:
+#
+# A class to provide a persistent key/value store with a bounded number of
+# entries. The least recently used entries are evicted first.
+#
+# ------------------------------------------------------------------------------
+
+import os
+import json
+import time
+import sqlite3
+
+# ------------------------------------------------------------------------------
+#
+# Class Cache
+#
+# ------------------------------------------------------------------------------
+class Cache():
+
+    # --------------------------------------------------------------------------
+    def __init__(self, filename, size=100000):
+        """Initialize (the cache file is opened on first use)"""
+
+        self.filename   = filename
+        self.size       = size
+        self.connection = None
+        self.disabled   = False
+
+    # --------------------------------------------------------------------------
+    def get(self, key):
+        """Provide the value of a key (None if unknown)"""
+
+        connection = self._connect()
+        if connection is None:
+            return None
+
+        try:
+            row = connection.execute( "SELECT value FROM entries WHERE key = ?", (key,) ).fetchone()
+            if row is None:
+                return None
+
+            # mark entry as recently used
+            connection.execute( "UPDATE entries SET used = ? WHERE key = ?", (time.time_ns(), key) )
+
+            return json.loads( row[0] )
+        except (sqlite3.Error, ValueError):
+            self._disable()
+            return None
+
+    # --------------------------------------------------------------------------
+    def set(self, key, value):
+        """Store the value of a key"""
+
+        connection = self._connect()
+        if connection is None:
+            return
+
+        try:
+            connection.execute( "INSERT OR REPLACE INTO entries (key, value, used) VALUES (?, ?, ?)",
+                                (key, json.dumps( value ), time.time_ns()) )
+        except (sqlite3.Error, TypeError, ValueError):
+            self._disable()
+
+    # --------------------------------------------------------------------------
+    def flush(self):
+        """Evict the least recently used entries and write all changes"""
+
+        connection = self.connection
+        if connection is None:
+            return
+
+        try:
+            count = connection.execute( "SELECT count(*) FROM entries" ).fetchone()[0]
+            if count > self.size:
+                connection.execute( "DELETE FROM entries WHERE key IN "
+                                    "(SELECT key FROM entries ORDER BY used LIMIT ?)", (count - self.size,) )
+            connection.commit()
+        except sqlite3.Error:
+            self._disable()
+
+    # --------------------------------------------------------------------------
+    def close(self):
+        """Write all changes and close the cache file"""
+
+        self.flush()
+
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    # --------------------------------------------------------------------------
+    def _connect(self):
+        """Open the cache file"""
+
+        if self.connection is None and not self.disabled:
+            try:
+                directory = os.path.dirname( self.filename )
+                if directory:
+                    os.makedirs( directory, exist_ok=True )
+
+                self.connection = sqlite3.connect( self.filename, timeout=30 )
+                self.connection.execute( "CREATE TABLE IF NOT EXISTS entries "
+                                         "(key TEXT PRIMARY KEY, value TEXT, used INTEGER)" )
+                self.connection.execute( "CREATE INDEX IF NOT EXISTS entries_used ON entries (used)" )
+            except (OSError, sqlite3.Error):
+                self._disable()
+
+        return self.connection
+
+    # --------------------------------------------------------------------------
+    def _disable(self):
+        """Stop using a broken cache file"""
+
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except sqlite3.Error:
+                pass
+
+        self.connection = None
+        self.disabled   = True
+
+    # --------------------------------------------------------------------------
+    def getFilename(self):
+        """Provide filename"""
+        return self.filename
+
+    # --------------------------------------------------------------------------
+    def getSize(self):
+        """Provide maximum number of entries"""
+        return self.size
@@ -12,7 +12,18 @@
 # - adding networks, components etc. under tenants is not reflected in delta list
 # ------------------------------------------------------------------------------
 
-import yaml
+from ao.model.model import Model
+
+# placeholder for an attribute which is missing in one of the models
+MISSING = object()
+
+# sequence of the actions in a delta
+ORDER = {
+    "remove": 1,
+    "keep":   2,
+    "change": 3,
+    "add":    4
+}
 
 # ------------------------------------------------------------------------------
 #
@@ -22,12 +33,13 @@ import yaml
 class Delta():
 
     # --------------------------------------------------------------------------
-    def __init__(self, model1, model2):
-        """Initialize delta"""
+    def __init__(self, model1, model2, details=False):
+        """Initialize delta (details: record the changed attributes)"""
 
         # save references to models and the diff
-        self.model1 = model1
-        self.model2 = model2
+        self.model1  = model1
+        self.model2  = model2
+        self.details = details
         self.tree1  = model1.getModel()
         self.tree2  = model2.getModel()
         self.model  = {
@@ -39,10 +51,14 @@ class Delta():
             "vnfs":       []
         }
 
-        # create indexes for both models
+        # create indexes for both models: (type, fqn) -> entity
         self.index1 = self._create_index( self.tree1 )
         self.index2 = self._create_index( self.tree2 )
 
+        # content and tree hashes of all entities: (type, fqn) -> (content, tree)
+        self.hashes1 = self.model1.getHashes()
+        self.hashes2 = self.model2.getHashes()
+
         # difference between external components
         components  = self.model["components"]
         components1 = self.tree1["components"]
@@ -53,58 +69,37 @@ class Delta():
         vnfs  = self.model["vnfs"]
         vnfs1 = self.tree1["vnfs"]
         vnfs2 = self.tree2["vnfs"]
-        self._delta_entities( vnfs, vnfs1, vnfs2 )
-
-        # difference between child elements of VNFs
-        for vnf in vnfs:
-
-            if vnf["action"] == "keep" or vnf["action"] == "change":
-                vnf["tenants"] = []
-
-                fqn  = vnf["type"] + ":" + vnf["fqn"]
-                vnf1 = self.index1[fqn]
-                vnf2 = self.index2[fqn]
-
-                tenants  = vnf["tenants"]
-                tenants1 = vnf1["tenants"]
-                tenants2 = vnf2["tenants"]
-                self._delta_entities( tenants, tenants1, tenants2 )
 
-                # difference between child elements of tenants
-                for tenant in tenants:
+        # difference between child elements of kept or changed VNFs
+        for vnf, vnf1, vnf2 in self._delta_entities( vnfs, vnfs1, vnfs2 ):
+            vnf["tenants"] = []
 
-                    if tenant["action"] == "keep" or tenant["action"] == "change":
-                        tenant["networks"]   = []
-                        tenant["components"] = []
+            tenants  = vnf["tenants"]
+            tenants1 = vnf1["tenants"]
+            tenants2 = vnf2["tenants"]
 
-                        fqn     = tenant["type"] + ":" + tenant["fqn"]
-                        tenant1 = self.index1[fqn]
-                        tenant2 = self.index2[fqn]
+            # difference between child elements of tenants
+            for tenant, tenant1, tenant2 in self._delta_entities( tenants, tenants1, tenants2 ):
+                tenant["networks"]   = []
+                tenant["components"] = []
 
-                        networks  = tenant["networks"]
-                        networks1 = tenant1["networks"]
-                        networks2 = tenant2["networks"]
-                        self._delta_entities( networks, networks1, networks2 )
+                networks  = tenant["networks"]
+                networks1 = tenant1["networks"]
+                networks2 = tenant2["networks"]
+                self._delta_entities( networks, networks1, networks2 )
 
-                        # difference between external components
-                        components  = tenant["components"]
-                        components1 = tenant1["components"]
-                        components2 = tenant2["components"]
-                        self._delta_entities( components, components1, components2 )
+                components  = tenant["components"]
+                components1 = tenant1["components"]
+                components2 = tenant2["components"]
 
-                        # difference between child elements of tenants
-                        for component in components:
-                            if component["action"] == "keep" or component["action"] == "change":
-                                component["nodes"] = []
+                # difference between child elements of internal components
+                for component, component1, component2 in self._delta_entities( components, components1, components2 ):
+                    component["nodes"] = []
 
-                                fqn        = component["type"] + ":" + component["fqn"]
-                                component1 = self.index1[fqn]
-                                component2 = self.index2[fqn]
-
-                                nodes  = component["nodes"]
-                                nodes1 = component1["nodes"]
-                                nodes2 = component2["nodes"]
-                                self._delta_entities( nodes, nodes1, nodes2 )
+                    nodes  = component["nodes"]
+                    nodes1 = component1["nodes"]
+                    nodes2 = component2["nodes"]
+                    self._delta_entities( nodes, nodes1, nodes2 )
 
         # sort arrays in diff
         self.model["components"] = sorted( self.model["components"], key=self._action)
@@ -125,6 +120,11 @@ class Delta():
         """Provide model object"""
         return self.model
 
+    # --------------------------------------------------------------------------
+    def getDetails(self):
+        """Provide details flag"""
+        return self.details
+
     # --------------------------------------------------------------------------
     def getModel1(self):
         """Provide first model object"""
@@ -137,81 +137,100 @@ class Delta():
 
     # --------------------------------------------------------------------------
     def _action(self, item):
-        if item["action"] == "remove":
-            return 1
-        if item["action"] == "keep":
-            return 2
-        if item["action"] == "change":
-            return 3
-        if item["action"] == "add":
-            return 4
+        return ORDER[item["action"]]
 
     # --------------------------------------------------------------------------
     def _create_index(self, model ):
         index = {}
 
         for component in model["components"]:
-            index["ExternalComponent:" + component["fqn"]] = component
+            index[("ExternalComponent", component["fqn"])] = component
 
         for vnf in model["vnfs"]:
-            index["VNF:" + vnf["fqn"]] = vnf
+            index[("VNF", vnf["fqn"])] = vnf
 
             for tenant in vnf["tenants"]:
-                index["Tenant:" + tenant["fqn"]] = tenant
+                index[("Tenant", tenant["fqn"])] = tenant
 
                 for network in tenant["networks"]:
-                    index["Network:" + network["fqn"]] = network
+                    index[("Network", network["fqn"])] = network
 
                 for component in tenant["components"]:
-                    index["InternalComponent:" + component["fqn"]] = component
+                    index[("InternalComponent", component["fqn"])] = component
 
                     for node in component["nodes"]:
-                        index["Node:" + node["fqn"]] = node
+                        index[("Node", node["fqn"])] = node
 
         return index
 
     # --------------------------------------------------------------------------
     def _delta_entities(self, list, list1, list2 ):
+        # delta between two lists of entities, provides the kept or changed
+        # entities together with their counterparts in both models
+        index1  = self.index1
+        index2  = self.index2
+        hashes1 = self.hashes1
+        hashes2 = self.hashes2
+        pairs   = []
 
-        # delta between two lists of entities
         for item1 in list1:
-            type1 = item1["type"]
-            fqn1  = item1["fqn"]
-            fqn   = type1 + ":" + fqn1
-            print( fqn )
-            if not fqn in self.index2:
-                entity = { "type": type1, "fqn": fqn1, "action": "remove" }
-                self._delta_subentities( entity, self.index1[fqn] )
+            key   = (item1["type"], item1["fqn"])
+            item2 = index2.get( key )
+
+            if item2 is None:
+                entity = { "type": key[0], "fqn": key[1], "action": "remove" }
+                self._delta_subentities( entity, index1[key] )
+                list.append( entity )
+                continue
+
+            item1 = index1[key]
+            hash1 = hashes1.get( key )
+            hash2 = hashes2.get( key )
+
+            # identical subtree: no need to compare the child elements
+            if hash1 is not None and hash1 == hash2:
+                entity = { "type": key[0], "fqn": key[1], "action": "keep" }
+                self._keep_subentities( entity, item1 )
                 list.append( entity )
+                continue
+
+            if hash1 is not None and hash2 is not None:
+                difference = hash1[0] != hash2[0]
+            else:
+                difference = self._delta_entity( key[0], item1, item2 )
+
+            if difference:
+                entity = { "type": key[0], "fqn": key[1], "action": "change" }
+                if self.details:
+                    entity["changes"] = self._delta_attributes( key[0], item1, item2 )
             else:
-                item2 = self.index2[fqn]
-                if type1 == "ExternalComponent":
-                    difference = (item1!=item2)
-                elif type1 == "VNF":
-                    difference = self._delta_vnf( item1, item2 )
-                elif type1 == "Tenant":
-                    difference = self._delta_tenant( item1, item2 )
-                elif type1 == "Network":
-                    difference = (item1!=item2)
-                elif type1 == "InternalComponent":
-                    difference = self._delta_internal_component( item1, item2 )
-                elif type1 == "Node":
-                    difference = (item1!=item2)
-
-                if difference:
-                    list.append( { "type": type1, "fqn": fqn1, "action": "change" } )
-                else:
-                    list.append( { "type": type1, "fqn": fqn1, "action": "keep" } )
+                entity = { "type": key[0], "fqn": key[1], "action": "keep" }
+
+            list.append( entity )
+            pairs.append( (entity, item1, item2) )
 
         for item2 in list2:
-            type2 = item2["type"]
-            fqn2  = item2["fqn"]
-            fqn   = type2 + ":" + fqn2
-            if not fqn in self.index1:
-                entity = { "type": type2, "fqn": fqn2, "action": "add" }
-                self._delta_subentities( entity, self.index2[fqn] )
+            key = (item2["type"], item2["fqn"])
+
+            if not key in index1:
+                entity = { "type": key[0], "fqn": key[1], "action": "add" }
+                self._delta_subentities( entity, index2[key] )
                 list.append( entity )
 
+        return pairs
+
+    # --------------------------------------------------------------------------
+    def _delta_entity(self, type, item1, item2 ):
+        if type == "VNF":
+            return self._delta_vnf( item1, item2 )
+        if type == "Tenant":
+            return self._delta_tenant( item1, item2 )
+        if type == "InternalComponent":
+            return self._delta_internal_component( item1, item2 )
+
+        # external components, networks and nodes
+        return item1 != item2
+
     # --------------------------------------------------------------------------
     def _delta_subentities(self, entity, element ):
         action = entity["action"]
@@ -247,6 +266,84 @@ class Delta():
                 subentity = { "type": "Node", "fqn": node["fqn"], "action": action }
                 entity["nodes"].append( subentity )
 
+    # --------------------------------------------------------------------------
+    def _delta_attributes(self, type, item1, item2 ):
+        # changed attributes of an entity: [ { "path", "old", "new" } ]
+        changes    = []
+        attributes = Model.hashed_attributes.get( type )
+
+        if attributes is None:
+            attributes = [ attr for attr in item1 if not attr in ["fqn","type"] ] + \
+                         [ attr for attr in item2 if not attr in item1 ]
+
+        for attr in attributes:
+            self._delta_values( changes, "/" + self._escape( attr ), item1.get( attr, MISSING ), item2.get( attr, MISSING ) )
+
+        return changes
+
+    # --------------------------------------------------------------------------
+    def _delta_values(self, changes, path, value1, value2 ):
+        # identical values
+        if value1 == value2:
+            return
+
+        # compare the entries of mappings
+        if isinstance( value1, dict ) and isinstance( value2, dict ):
+            for key in list( value1 ) + [ key for key in value2 if not key in value1 ]:
+                self._delta_values( changes, path + "/" + self._escape( key ),
+                                    value1.get( key, MISSING ), value2.get( key, MISSING ) )
+
+        # compare the entries of lists of the same length
+        elif isinstance( value1, list ) and isinstance( value2, list ) and len( value1 ) == len( value2 ):
+            for index, (entry1, entry2) in enumerate( zip( value1, value2 ) ):
+                self._delta_values( changes, path + "/" + str( index ), entry1, entry2 )
+
+        # changed, added or removed value
+        else:
+            change = { "path": path }
+            if value1 is not MISSING:
+                change["old"] = value1
+            if value2 is not MISSING:
+                change["new"] = value2
+            changes.append( change )
+
+    # --------------------------------------------------------------------------
+    def _escape(self, name ):
+        # json pointer reference token
+        return str( name ).replace( "~", "~0" ).replace( "/", "~1" )
+
+    # --------------------------------------------------------------------------
+    def _keep_subentities(self, entity, element ):
+        type = entity["type"]
+
+        # keep all subelements of a VNF
+        if type == "VNF":
+            entity["tenants"] = []
+            for tenant in element["tenants"]:
+                subentity = { "type": "Tenant", "fqn": tenant["fqn"], "action": "keep" }
+                entity["tenants"].append( subentity )
+                self._keep_subentities( subentity, tenant )
+
+        # keep all subelements of a tenant
+        elif type == "Tenant":
+            entity["networks"]   = []
+            entity["components"] = []
+            for network in element["networks"]:
+                subentity = { "type": "Network", "fqn": network["fqn"], "action": "keep" }
+                entity["networks"].append( subentity )
+
+            for component in element["components"]:
+                subentity = { "type": "InternalComponent", "fqn": component["fqn"], "action": "keep" }
+                entity["components"].append( subentity )
+                self._keep_subentities( subentity, component )
+
+        # keep all subelements of a component
+        elif type == "InternalComponent":
+            entity["nodes"] = []
+            for node in element["nodes"]:
+                subentity = { "type": "Node", "fqn": node["fqn"], "action": "keep" }
+                entity["nodes"].append( subentity )
+
     # --------------------------------------------------------------------------
     def _delta_vnf(self, vnf1, vnf2 ):
         for attr in ["description","version","vendor","state"]:
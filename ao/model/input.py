@@ -9,7 +9,7 @@
 #
 # ------------------------------------------------------------------------------
 
-import yaml
+from ao.model import backend
 import os
 import sys
 
@@ -21,10 +21,11 @@ import sys
 class Input():
 
     # --------------------------------------------------------------------------
-    def __init__(self, directory=None):
+    def __init__(self, directory=None, keep=True):
         """Initialize"""
 
         self.directory = directory
+        self.keep      = keep
         self.filename  = None
         self.data      = None
         self.object    = None
@@ -34,31 +35,43 @@ class Input():
         """Read data from STDIN or a file"""
 
         self.filename = filename
-        self.data     = ''
+        self.data     = None
 
         try:
             # read from STDIN
             if filename is None:
-                for line in sys.stdin:
-                    self.data += line
+                self.object = self._read( sys.stdin, yaml )
             # read from file
             else:
                 if self.directory:
                     self.filename = os.path.join( self.directory, filename )
 
                 with open( self.filename, 'r' ) as stream:
-                    self.data = stream.read()
-
-            if yaml:
-                self.object = yaml.safe_load(self.data)
-            else:
-                self.object = self.data
+                    self.object = self._read( stream, yaml )
         except Exception as e:
             self.object = None
 
         # return object
         return self.object
 
+    # --------------------------------------------------------------------------
+    def _read(self, stream, yaml):
+        """Read data from a stream"""
+
+        # parse directly from the stream without keeping the raw text
+        if yaml and not self.keep:
+            return backend.load( stream )
+
+        # read the text as one block
+        data = stream.read()
+
+        if self.keep:
+            self.data = data
+
+        if yaml:
+            return backend.load( data )
+        return data
+
     # --------------------------------------------------------------------------
     def getDirectory(self):
         """Provide directory"""
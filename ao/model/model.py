@@ -50,6 +50,20 @@
 #
 # ------------------------------------------------------------------------------
 
+import json
+import hashlib
+from collections import namedtuple
+
+# ------------------------------------------------------------------------------
+#
+# Rule: immutable security rule shared between all interfaces using it
+#
+# ------------------------------------------------------------------------------
+Rule = namedtuple( "Rule", ["direction","mode","group","protocol","min","max","family","prefix"] )
+
+# canonical json encoding of entities used for content hashes
+ENCODER = json.JSONEncoder( sort_keys=True, separators=(",",":"), check_circular=False, default=repr )
+
 # ------------------------------------------------------------------------------
 #
 # Class Model
@@ -59,16 +73,32 @@ class Model():
 
     supported_schemas = ["V0.1.1"]
 
+    # attributes which are compared to detect a change of an entity
+    # (all attributes of external components, networks and nodes)
+    hashed_attributes = {
+        "VNF":               ["description","version","vendor","state"],
+        "Tenant":            ["description","version","datacenter","state"],
+        "InternalComponent": ["description","version","placement",
+                              "flavor","image","sizing",
+                              "user_data","metadata","state","volumes","interfaces","dependencies","services"]
+    }
+
     # --------------------------------------------------------------------------
-    def __init__(self, context="default", schema="V0.1.1", model=None):
+    def __init__(self, context="default", schema="V0.1.1", model=None, check=False):
         """Initialize model """
 
         # check schema compatability
         if not schema in Model.supported_schemas:
             raise AttributeError( "Unsupported schema" )
 
-        self.model  = self._get_default_model(context,schema)
-        self.schema = schema
+        self.model      = self._get_default_model(context,schema)
+        self.schema     = schema
+        self.index      = self._get_default_index()
+        self.check      = check
+        self.references = None
+        self.touched    = self._get_default_touched()
+        self.hashes     = {}
+        self.dirty      = None
 
     # --------------------------------------------------------------------------
     def getModel(self):
@@ -81,7 +111,36 @@ class Model():
         return self.schema
 
     # --------------------------------------------------------------------------
-    def set(self, tosca):
+    def getHashes(self):
+        """Provide content and tree hashes of all entities: (type, fqn) -> (content, tree)"""
+
+        hashes = self.hashes
+
+        # forget the hashes of all changed entities
+        if self.dirty is None:
+            hashes.clear()
+        else:
+            for key in self.dirty:
+                hashes.pop( key, None )
+        self.dirty = set()
+
+        # calculate missing hashes (children before their parents)
+        count = 0
+        rules = {}
+        for type in ["Node","Network","ExternalComponent","InternalComponent","Tenant","VNF"]:
+            for fqn, entity in self.index[type].items():
+                count += 1
+                if not (type, fqn) in hashes:
+                    hashes[(type, fqn)] = self._get_hash( type, entity, rules )
+
+        # drop the hashes of removed entities
+        if len(hashes) > count:
+            self.hashes = hashes = { key: value for key, value in hashes.items() if key[1] in self.index[key[0]] }
+
+        return hashes
+
+    # --------------------------------------------------------------------------
+    def set(self, tosca, incremental=True):
         """Apply change to model"""
 
         # iterate over all node templates
@@ -105,12 +164,59 @@ class Model():
             elif type == "Node":
                 self.set_node( fqn, data )
 
-        # check and create references
-        self._set_references()
+        # check and create references (only for the touched entities)
+        if not incremental:
+            self.touched["all"] = True
+
+        self._update_references()
+
+        if self.check:
+            self._check_references()
 
         # increment version
         self.model["version"] = self.model["version"] + 1
 
+    # --------------------------------------------------------------------------
+    def set_model(self, model):
+        """Replace the model by a model tree (e.g. a stored snapshot)"""
+
+        # check schema compatability
+        if not model.get("schema") in Model.supported_schemas:
+            raise AttributeError( "Unsupported schema" )
+
+        self.model      = model
+        self.schema     = model["schema"]
+        self.index      = self._get_default_index()
+        self.references = None
+        self.touched    = self._get_default_touched()
+        self.hashes     = {}
+        self.dirty      = None
+
+        # rebuild the index
+        components = {}
+        for component in model["components"]:
+            self.index["ExternalComponent"][component["fqn"]] = component
+
+        for vnf in model["vnfs"]:
+            self.index["VNF"][vnf["fqn"]] = vnf
+            for tenant in vnf["tenants"]:
+                self.index["Tenant"][tenant["fqn"]] = tenant
+                for network in tenant["networks"]:
+                    self.index["Network"][network["fqn"]] = network
+                for component in tenant["components"]:
+                    self.index["InternalComponent"][component["fqn"]] = component
+                    components[component["fqn"]] = component
+                    for node in component["nodes"]:
+                        self.index["Node"][node["fqn"]] = node
+
+        # restore the shared rules
+        rules = {}
+        for component in components.values():
+            for interface in component["interfaces"]:
+                interface["rules"] = [ rules.setdefault( rule, rule ) for rule in interface.get("rules", []) ]
+
+        self._set_node_rules(components)
+
     # --------------------------------------------------------------------------
     def set_external_component(self, fqn, data):
         # determine name
@@ -118,26 +224,24 @@ class Model():
         state = data["state"]
 
         components = self.model["components"]
-        component = self._get( components, fqn )
+        component = self._get( "ExternalComponent", fqn )
         if not component:
             component = self._get_default_external_component( fqn )
 
         # check if the network has been defined
-        networks = []
-        for vnf in self.model["vnfs"]:
-            for tenant in vnf["tenants"]:
-                networks = networks + tenant["networks"]
-
         for listname in ["services","dependencies"]:
             if listname  in data:
                 for entry in data[listname]:
-                    network = self._get( networks, entry["network"] )
+                    network = self._get( "Network", entry["network"] )
                     if not network:
                         raise AttributeError( "Invalid network name" )
 
+        self.touched["components"].add( fqn )
+        self._touch( "ExternalComponent", fqn )
+
         # check if the component needs to be undefined
         if state == "undefined":
-            self._remove( components, name )
+            self._remove( components, component )
             return
 
         # update the attributes
@@ -155,15 +259,18 @@ class Model():
         state = data["state"]
 
         vnfs = self.model["vnfs"]
-        vnf = self._get( vnfs, fqn )
+        vnf = self._get( "VNF", fqn )
         if not vnf:
             vnf = self._get_default_vnf( fqn )
 
         # check if the vnf needs to be undefined
         if state == "undefined":
-            self._remove( vnfs, name )
+            self.touched["all"] = True
+            self._remove( vnfs, vnf )
             return
 
+        self._touch( "VNF", fqn )
+
         # update the attributes
         for attr in ["name","description","version","vendor","state","public_key"]:
             self._replace( vnf, data, attr )
@@ -181,21 +288,23 @@ class Model():
         name    = data["name"]
         state   = data["state"]
 
-        vnfs = self.model["vnfs"]
-        vnf = self._get( vnfs, vnf_fqn )
+        vnf = self._get( "VNF", vnf_fqn )
         if not vnf:
             raise AttributeError( "Invalid VNF context" )
 
         tenants = vnf["tenants"]
-        tenant = self._get( tenants, fqn )
+        tenant = self._get( "Tenant", fqn )
         if not tenant:
             tenant = self._get_default_tenant( fqn )
 
         # check if the vnf needs to be undefined
         if state == "undefined":
-            self._remove( tenants, name )
+            self.touched["all"] = True
+            self._remove( tenants, tenant )
             return
 
+        self._touch( "Tenant", fqn )
+
         # update the attributes
         for attr in ["name","description","version","datacenter","state","flavors"]:
             self._replace( tenant, data, attr )
@@ -214,24 +323,25 @@ class Model():
         name       = data["name"]
         state      = data["state"]
 
-        vnfs = self.model["vnfs"]
-        vnf = self._get( vnfs, vnf_fqn )
+        vnf = self._get( "VNF", vnf_fqn )
         if not vnf:
             raise AttributeError( "Invalid VNF context" )
 
-        tenants = vnf["tenants"]
-        tenant = self._get( tenants, tenant_fqn )
+        tenant = self._get( "Tenant", tenant_fqn )
         if not tenant:
             raise AttributeError( "Invalid tenant context" )
 
         networks = tenant["networks"]
-        network = self._get( networks, fqn )
+        network = self._get( "Network", fqn )
         if not network:
             network = self._get_default_network( fqn )
 
+        self.touched["networks"].add( fqn )
+        self._touch( "Network", fqn )
+
         # check if the network needs to be undefined
         if state == "undefined":
-            self._remove( networks, name )
+            self._remove( networks, network )
             return
 
         # update the attributes
@@ -258,31 +368,27 @@ class Model():
         name       = data["name"]
         state      = data["state"]
 
-        vnfs = self.model["vnfs"]
-        vnf = self._get( vnfs, vnf_fqn )
+        vnf = self._get( "VNF", vnf_fqn )
         if not vnf:
             raise AttributeError( "Invalid VNF context" )
 
-        tenants = vnf["tenants"]
-        tenant = self._get( tenants, tenant_fqn)
+        tenant = self._get( "Tenant", tenant_fqn)
         if not tenant:
             raise AttributeError( "Invalid tenant context" )
 
         components = tenant["components"]
-        component = self._get( components, fqn )
+        component = self._get( "InternalComponent", fqn )
         if not component:
             component = self._get_default_internal_component( fqn )
 
         # check if the network has been defined
-        networks = self.model["networks"] + tenant["networks"]
-
         for listname in ["interfaces","services","dependencies"]:
             if listname  in data:
                 for entry in data[listname]:
                     # normalize names relative to tenant context
                     if not entry["network"].startswith("/"):
                         entry["network"] = tenant_fqn + "/" + entry["network"]
-                    network = self._get( networks, entry["network"] )
+                    network = self._get_tenant_network( tenant, entry["network"] )
                     if not network:
                         raise AttributeError( "Invalid network name" )
 
@@ -290,9 +396,12 @@ class Model():
         if not any(f["name"] == data["flavor"] for f in tenant["flavors"] ):
             raise AttributeError( "Invalid flavor name" )
 
+        self.touched["components"].add( fqn )
+        self._touch( "InternalComponent", fqn )
+
         # check if the vnf needs to be undefined
         if state == "undefined":
-            self._remove( components, name )
+            self._remove( components, component )
             return
 
         # update the attributes
@@ -317,38 +426,33 @@ class Model():
         name          = data["name"]
         state         = data["state"]
 
-        vnfs = self.model["vnfs"]
-        vnf = self._get( vnfs, vnf_fqn )
+        vnf = self._get( "VNF", vnf_fqn )
         if not vnf:
             raise AttributeError( "Invalid VNF context" )
 
-        tenants = vnf["tenants"]
-        tenant = self._get( tenants, tenant_fqn )
+        tenant = self._get( "Tenant", tenant_fqn )
         if not tenant:
             raise AttributeError( "Invalid tenant context" )
 
-        components = tenant["components"]
-        component = self._get( components, component_fqn )
+        component = self._get( "InternalComponent", component_fqn )
         if not component:
             raise AttributeError( "Invalid component context" )
 
         nodes = component["nodes"]
-        node = self._get( nodes, fqn )
+        node = self._get( "Node", fqn )
         new_node = False
         if not node:
             new_node = True
             node = self._get_default_node( fqn )
 
         # check if the network has been defined
-        networks = self.model["networks"] + tenant["networks"]
-
         for listname in ["interfaces","services","dependencies"]:
             if listname  in data:
                 for entry in data[listname]:
                     # normalize names relative to tenant context
                     if not entry["network"].startswith("/"):
                         entry["network"] = tenant_fqn + "/" + entry["network"]
-                    network = self._get( networks, entry["network"] )
+                    network = self._get_tenant_network( tenant, entry["network"] )
                     if not network:
                         raise AttributeError( "Invalid network name" )
 
@@ -365,9 +469,12 @@ class Model():
             if new_size < sizing["min"]:
                 raise AttributeError( "Too few nodes" )
 
+        self.touched["components"].add( component_fqn )
+        self._touch( "Node", fqn )
+
         # check if the vnf needs to be undefined
         if state == "undefined":
-            self._remove( nodes, name )
+            self._remove( nodes, node )
             return
 
         # update the attributes
@@ -386,6 +493,8 @@ class Model():
     # --------------------------------------------------------------------------
     # --------------------------------------------------------------------------
     def _set_tenant_state(self, tenant, state):
+        if tenant["state"] != state:
+            self._touch( "Tenant", tenant["fqn"] )
         tenant["state"] = state
 
         # propagate the state
@@ -396,10 +505,14 @@ class Model():
 
     # --------------------------------------------------------------------------
     def _set_network_state(self, network, state):
+        if network["state"] != state:
+            self._touch( "Network", network["fqn"] )
         network["state"] = state
 
     # --------------------------------------------------------------------------
     def _set_component_state(self, component, state):
+        if component["state"] != state:
+            self._touch( "InternalComponent", component["fqn"] )
         component["state"] = state
 
         # propagate the state
@@ -408,13 +521,15 @@ class Model():
 
     # --------------------------------------------------------------------------
     def _set_node_state(self, node, state):
+        if node["state"] != state:
+            self._touch( "Node", node["fqn"] )
         node["state"] = state
 
         # propagate the state
         for volume in node["volumes"]:
             self._set_volume_state( volume, state )
-        for interface in node["interface"]:
-            self._set_interace_state( interface, state )
+        for interface in node["interfaces"]:
+            self._set_interface_state( interface, state )
 
     # --------------------------------------------------------------------------
     def _set_volume_state(self, volume, state):
@@ -439,6 +554,31 @@ class Model():
 
         return model
 
+    # --------------------------------------------------------------------------
+    def _get_default_index(self):
+        # fqn -> entity lookup tables per entity type
+        index = {
+            "ExternalComponent": {},
+            "VNF":               {},
+            "Tenant":            {},
+            "Network":           {},
+            "InternalComponent": {},
+            "Node":              {}
+        }
+
+        return index
+
+    # --------------------------------------------------------------------------
+    def _get_default_touched(self):
+        # entities changed since the references have been calculated
+        touched = {
+            "all":        False,
+            "components": set(),
+            "networks":   set()
+        }
+
+        return touched
+
     # --------------------------------------------------------------------------
     def _get_default_external_component(self,fqn):
         component = {
@@ -577,37 +717,250 @@ class Model():
     def _set_references(self):
         networks     = self._get_networks()
         components   = self._get_components()
-        services     = self._get_services(components)
-        links        = self._get_links(components,services)
+        interfaces   = self._get_interfaces(components)
+        references   = self._get_references(components)
+        links        = []
+
+        for fqn in components:
+            links.extend( references["links"][fqn] )
+
+        self.model["consistent"] = not references["missing"]
+
+        self._set_rules(networks,components,interfaces,links)
+
+        self.references = references
+        self.touched    = self._get_default_touched()
+        self.dirty      = None
+
+    # --------------------------------------------------------------------------
+    def _update_references(self):
+        touched    = self.touched
+        references = self.references
+
+        # fall back to a full recalculation
+        if references is None or touched["all"]:
+            self._set_references()
+            return
+
+        networks   = self._get_networks()
+        components = self._get_components()
+        services   = references["services"]
+
+        # components which need to recalculate their links
+        relinked = set( touched["components"] )
+
+        # replace the services provided by touched components
+        for fqn in touched["components"]:
+            for service_fqn in references["provided"].pop(fqn, []):
+                del services[ service_fqn ]
+                relinked.update( references["dependents"].get(service_fqn, ()) )
+
+            component = components.get(fqn)
+            if component:
+                provided = self._get_services( { fqn: component } )
+                services.update( provided )
+                references["provided"][fqn] = list( provided )
+
+                for service_fqn in provided:
+                    relinked.update( references["dependents"].get(service_fqn, ()) )
 
-        self._set_rules(networks,components,links)
+        # components which need to recalculate their rules
+        affected = set( relinked )
+
+        for fqn in relinked:
+            for link in self._remove_references( references, fqn ):
+                affected.add( link["target_component"] )
+
+            component = components.get(fqn)
+            if component:
+                for link in self._add_references( references, component ):
+                    affected.add( link["target_component"] )
+
+        # components linked via touched networks
+        if touched["networks"]:
+            for links in references["links"].values():
+                for link in links:
+                    if link["source_network"] in touched["networks"] or \
+                       link["target_network"] in touched["networks"]:
+                        affected.add( link["source_component"] )
+                        affected.add( link["target_component"] )
+
+        # recalculate rules of affected components in model order
+        order      = { fqn: position for position, fqn in enumerate(components) }
+        affected   = { fqn: components[fqn] for fqn in sorted( affected & set(order), key=order.get ) }
+        interfaces = self._get_interfaces(affected)
+
+        self._clear_rules(affected)
+
+        # identical rules are shared within this recalculation
+        rules = {}
+
+        for fqn, component in affected.items():
+            if component["type"] == "InternalComponent":
+                self._touch( "InternalComponent", fqn )
+                for node in component["nodes"]:
+                    self._touch( "Node", node["fqn"] )
+
+        for fqn in affected:
+            for link in self._get_component_links(references, fqn, order):
+                if link["source_component"] == fqn and not link["source_external"]:
+                    self._set_egress_rules(link,networks,components,interfaces,rules)
+                if link["target_component"] == fqn and not link["target_external"]:
+                    self._set_ingress_rules(link,networks,components,interfaces,rules)
+
+        self._set_node_rules(affected)
+
+        self.model["consistent"] = not references["missing"]
+        self.touched             = self._get_default_touched()
+
+    # --------------------------------------------------------------------------
+    def _check_references(self):
+        rules1 = self._get_interface_rules()
+
+        # compare with a full recalculation
+        self._set_references()
+
+        rules2 = self._get_interface_rules()
+
+        if rules1 != rules2:
+            raise AttributeError( "Inconsistent references" )
+
+    # --------------------------------------------------------------------------
+    def _get_interface_rules(self):
+        rules = [ self.model["consistent"] ]
+
+        for component in self._get_components().values():
+            for interface in component.get("interfaces", []):
+                rules.append( (component["fqn"], list( interface.get("rules", []) )) )
+            for node in component.get("nodes", []):
+                for interface in node["interfaces"]:
+                    rules.append( (node["fqn"], list( interface.get("rules", []) )) )
+
+        return rules
+
+    # --------------------------------------------------------------------------
+    def _get_references(self,components):
+        references = {
+            "services":   self._get_services(components), # service -> service data
+            "provided":   {},                             # component -> services
+            "required":   {},                             # component -> services
+            "dependents": {},                             # service -> components
+            "links":      {},                             # source -> links
+            "targets":    {},                             # target -> links
+            "missing":    {}                              # component -> unresolved
+        }
+
+        for service in references["services"].values():
+            references["provided"].setdefault( service["component"], [] ).append( service["fqn"] )
+
+        for component in components.values():
+            self._add_references( references, component )
+
+        return references
+
+    # --------------------------------------------------------------------------
+    def _add_references(self,references,component):
+        fqn = component["fqn"]
+
+        links, missing = self._get_links( component, references["services"] )
+
+        references["links"][fqn]    = links
+        references["required"][fqn] = [ dependency["service"] for dependency in component["dependencies"] ]
+
+        for link in links:
+            references["targets"].setdefault( link["target_component"], [] ).append( link )
+
+        for service_fqn in references["required"][fqn]:
+            references["dependents"].setdefault( service_fqn, set() ).add( fqn )
+
+        if missing:
+            references["missing"][fqn] = missing
+
+        return links
+
+    # --------------------------------------------------------------------------
+    def _remove_references(self,references,fqn):
+        links = references["links"].pop(fqn, [])
+
+        for link in links:
+            targets = references["targets"][ link["target_component"] ]
+            for index, item in enumerate(targets):
+                if item is link:
+                    del targets[index]
+                    break
+            if not targets:
+                del references["targets"][ link["target_component"] ]
+
+        for service_fqn in references["required"].pop(fqn, []):
+            dependents = references["dependents"][ service_fqn ]
+            dependents.discard( fqn )
+            if not dependents:
+                del references["dependents"][ service_fqn ]
+
+        references["missing"].pop(fqn, None)
+
+        return links
+
+    # --------------------------------------------------------------------------
+    def _get_component_links(self,references,fqn,order):
+        # all links of sources which are relevant for the component
+        sources = { fqn }
+        for link in references["targets"].get(fqn, []):
+            sources.add( link["source_component"] )
+
+        # links in the same sequence as for a full recalculation
+        for source in sorted( sources & set(order), key=order.get ):
+            for link in references["links"].get(source, []):
+                if link["source_component"] == fqn or link["target_component"] == fqn:
+                    yield link
 
     # --------------------------------------------------------------------------
     def _get_networks(self):
-        networks = self.model["networks"]
+        networks = {}
+
+        for network in self.model["networks"]:
+            networks[ network["fqn"] ] = network
 
         for vnf in self.model["vnfs"]:
             for tenant in vnf["tenants"]:
-                networks = networks + tenant["networks"]
+                for network in tenant["networks"]:
+                    networks[ network["fqn"] ] = network
 
         return networks
 
     # --------------------------------------------------------------------------
     def _get_components(self):
-        components = self.model["components"]
+        components = {}
+
+        for component in self.model["components"]:
+            components[ component["fqn"] ] = component
 
         vnfs = self.model["vnfs"]
         for vnf in vnfs:
             tenants = vnf["tenants"]
             for tenant in tenants:
-                components = components + tenant["components"]
+                for component in tenant["components"]:
+                    components[ component["fqn"] ] = component
 
         return components
 
+    # --------------------------------------------------------------------------
+    def _get_interfaces(self,components):
+        interfaces = {}
+
+        # first interface of a component attached to a network
+        for component in components.values():
+            for interface in component.get("interfaces", []):
+                key = (component["fqn"], interface["network"])
+                if not key in interfaces:
+                    interfaces[ key ] = interface
+
+        return interfaces
+
     # --------------------------------------------------------------------------
     def _get_services(self,components):
         services = dict()
-        for component in components:
+        for component in components.values():
             for service in component["services"]:
                 network  = service["network"]
                 external = (component["type"] == "ExternalComponent")
@@ -625,71 +978,48 @@ class Model():
         return services
 
     # --------------------------------------------------------------------------
-    def _get_links(self,components,services):
-        links = []
+    def _get_links(self,component,services):
+        links   = []
+        missing = 0
 
-        self.model["consistent"] = True
+        for dependency in component["dependencies"]:
 
-        for component in components:
-            for dependency in component["dependencies"]:
+            # find service
+            service_fqn = dependency["service"]
 
-                # find service
-                service_fqn = dependency["service"]
+            # not found
+            if not service_fqn in services:
+                missing += 1
+                continue
 
-                # not found
-                if not service_fqn in services:
-                    self.model["consistent"] = False
-                    continue
+            # found
+            service = services[ service_fqn ]
 
-                # found
-                service = services[ service_fqn ]
+            # add new link
+            name = component["fqn"] + '-' + service["fqn"]
 
-                # add new link
-                name = component["fqn"] + '-' + service["fqn"]
+            external = (component["type"] == "ExternalComponent")
+            network  = dependency["network"]
 
-                external = (component["type"] == "ExternalComponent")
-                network  = dependency["network"]
-
-                link = {
-                    'name':              name,
-                    "service":           service["service"],
-                    'ports':             service["ports"],
-                    "source_component":  component["fqn"],
-                    "source_network":    network,
-                    "source_external":   external,
-                    "target_component":  service["component"],
-                    "target_network":    service["network"],
-                    "target_external":   service["external"]
-                }
-
-                links.append(link)
-
-        return links
+            link = {
+                'name':              name,
+                "service":           service["service"],
+                'ports':             service["ports"],
+                "source_component":  component["fqn"],
+                "source_network":    network,
+                "source_external":   external,
+                "target_component":  service["component"],
+                "target_network":    service["network"],
+                "target_external":   service["external"]
+            }
 
-    # --------------------------------------------------------------------------
-    def _get_interface(self,component,network):
-        for interface in component["interfaces"]:
-            if interface["network"] == network["fqn"]:
-                return interface
-        return None
-
-    # --------------------------------------------------------------------------
-    def _get_network(self,networks,fqn):
-        for network in networks:
-            if network["fqn"] == fqn:
-                return network
-        return None
+            links.append(link)
 
-    # --------------------------------------------------------------------------
-    def _get_component(self,components,fqn):
-        for component in components:
-            if component["fqn"] == fqn:
-                return component
-        return None
+        return links, missing
 
     # --------------------------------------------------------------------------
     def _clear_rules(self,components):
-        for component in components:
+        for component in components.values():
             if component["type"] == "InternalComponent":
                 for interface in component["interfaces"]:
                     interface["rules"] = []
@@ -698,173 +1028,322 @@ class Model():
                         interface["rules"] = []
 
     # --------------------------------------------------------------------------
-    def _set_rules(self,networks,components,links):
+    def _set_rules(self,networks,components,interfaces,links):
 
         # remove all existing rules first
         self._clear_rules(components)
 
+        # identical rules are shared within this calculation
+        rules = {}
+
         # loop over all links and calculate rules
         for link in links:
-
-            # determine source and target networks and components
-            source_network   = self._get_network( networks,     link["source_network"]   )
-            target_network   = self._get_network( networks,     link["target_network"]   )
-            source_component = self._get_component( components, link["source_component"] )
-            target_component = self._get_component( components, link["target_component"] )
-            ports            = link["ports"]
-
-            # ----- egress rules for internal source components -----
             if not link["source_external"]:
-                interface = self._get_interface(source_component,source_network)
-
-                # external targets
-                if link["target_external"]:
-                    for port in ports:
-                        for prefix in target_component["ipv4"]:
-                            rule = {
-                                "direction": "egress",
-                                "mode":      "cidr",
-                                "group":     link["target_component"],
-                                "protocol":  port["protocol"],
-                                "min":       port["min"],
-                                "max":       port["max"],
-                                "family":    "IPv4",
-                                "prefix":    prefix
-                            }
-                            interface["rules"].append(rule)
-                        for prefix in target_component["ipv6"]:
-                            rule = {
-                                "direction": "egress",
-                                "mode":      "cidr",
-                                "group":     link["target_component"],
-                                "protocol":  port["protocol"],
-                                "min":       port["min"],
-                                "max":       port["max"],
-                                "family":    "IPv6",
-                                "prefix":    prefix
-                            }
-                            interface["rules"].append(rule)
-                # internal targets
-                else:
-                    if "ipv4" in target_network:
-                        for port in ports:
-                            rule = {
-                                "direction": "egress",
-                                "mode":      "group",
-                                "group":     link["target_component"] + "/" + link["target_network"].split("/")[-1],
-                                "protocol":  port["protocol"],
-                                "min":       port["min"],
-                                "max":       port["max"],
-                                "family":    "IPv4",
-                                "prefix":    target_network["ipv4"]["cidr"]
-                            }
-                            interface["rules"].append(rule)
-                    if "ipv6" in target_network:
-                        for port in ports:
-                            rule = {
-                                "direction": "egress",
-                                "mode":      "group",
-                                "group":     link["target_component"] + "/" + link["target_network"].split("/")[-1],
-                                "protocol":  port["protocol"],
-                                "min":       port["min"],
-                                "max":       port["max"],
-                                "family":    "IPv6",
-                                "prefix":    target_network["ipv6"]["cidr"]
-                            }
-                            interface["rules"].append(rule)
-
-            # ----- ingress rules for internal target components -----
+                self._set_egress_rules(link,networks,components,interfaces,rules)
             if not link["target_external"]:
-                interface = self._get_interface(target_component, target_network)
-
-                # external sources
-                if link["source_external"]:
-                    for port in ports:
-                        for prefix in source_component["ipv4"]:
-                            rule = {
-                                "direction": "ingress",
-                                "mode":      "cidr",
-                                "group":     link["source_component"],
-                                "protocol":  port["protocol"],
-                                "min":       port["min"],
-                                "max":       port["max"],
-                                "family":    "IPv4",
-                                "prefix":    prefix
-                            }
-                            interface["rules"].append(rule)
-                        for prefix in source_component["ipv6"]:
-                            rule = {
-                                "direction": "ingress",
-                                "mode":      "cidr",
-                                "group":     link["source_component"],
-                                "protocol":  port["protocol"],
-                                "min":       port["min"],
-                                "max":       port["max"],
-                                "family":    "IPv6",
-                                "prefix":    prefix
-                            }
-                            interface["rules"].append(rule)
-                # internal sources
-                else:
-                    if "ipv4" in source_network:
-                        for port in ports:
-                            rule = {
-                                "direction": "ingress",
-                                "mode":      "group",
-                                "group":     link["source_component"] + "/" + link["source_network"].split("/")[-1],
-                                "protocol":  port["protocol"],
-                                "min":       port["min"],
-                                "max":       port["max"],
-                                "family":    "IPv4",
-                                "prefix":    target_network["ipv4"]["cidr"]
-                            }
-                            interface["rules"].append(rule)
-                    if "ipv6" in target_network:
-                        for port in ports:
-                            rule = {
-                                "direction": "egress",
-                                "mode":      "group",
-                                "group":     link["source_component"] + "/" + link["source_network"].split("/")[-1],
-                                "protocol":  port["protocol"],
-                                "min":       port["min"],
-                                "max":       port["max"],
-                                "family":    "IPv6",
-                                "prefix":    target_network["ipv6"]["cidr"]
-                            }
-                            interface["rules"].append(rule)
+                self._set_ingress_rules(link,networks,components,interfaces,rules)
 
         # apply component interface rules to node interfaces
-        for component in components:
+        self._set_node_rules(components)
+
+    # --------------------------------------------------------------------------
+    def _set_egress_rules(self,link,networks,components,interfaces,rules):
+        # determine source and target networks and components
+        source_network   = networks.get(   link["source_network"]   )
+        target_network   = networks.get(   link["target_network"]   )
+        source_component = components.get( link["source_component"] )
+        target_component = components.get( link["target_component"] )
+        ports            = link["ports"]
+
+        interface = interfaces.get( (link["source_component"], source_network["fqn"]) )
+
+        # external targets
+        if link["target_external"]:
+            for port in ports:
+                for prefix in target_component["ipv4"]:
+                    rule = self._get_rule(
+                        rules,
+                        direction = "egress",
+                        mode      = "cidr",
+                        group     = link["target_component"],
+                        protocol  = port["protocol"],
+                        min       = port["min"],
+                        max       = port["max"],
+                        family    = "IPv4",
+                        prefix    = prefix
+                    )
+                    interface["rules"].append(rule)
+                for prefix in target_component["ipv6"]:
+                    rule = self._get_rule(
+                        rules,
+                        direction = "egress",
+                        mode      = "cidr",
+                        group     = link["target_component"],
+                        protocol  = port["protocol"],
+                        min       = port["min"],
+                        max       = port["max"],
+                        family    = "IPv6",
+                        prefix    = prefix
+                    )
+                    interface["rules"].append(rule)
+        # internal targets
+        else:
+            if "ipv4" in target_network:
+                for port in ports:
+                    rule = self._get_rule(
+                        rules,
+                        direction = "egress",
+                        mode      = "group",
+                        group     = link["target_component"] + "/" + link["target_network"].split("/")[-1],
+                        protocol  = port["protocol"],
+                        min       = port["min"],
+                        max       = port["max"],
+                        family    = "IPv4",
+                        prefix    = target_network["ipv4"]["cidr"]
+                    )
+                    interface["rules"].append(rule)
+            if "ipv6" in target_network:
+                for port in ports:
+                    rule = self._get_rule(
+                        rules,
+                        direction = "egress",
+                        mode      = "group",
+                        group     = link["target_component"] + "/" + link["target_network"].split("/")[-1],
+                        protocol  = port["protocol"],
+                        min       = port["min"],
+                        max       = port["max"],
+                        family    = "IPv6",
+                        prefix    = target_network["ipv6"]["cidr"]
+                    )
+                    interface["rules"].append(rule)
+
+    # --------------------------------------------------------------------------
+    def _set_ingress_rules(self,link,networks,components,interfaces,rules):
+        # determine source and target networks and components
+        source_network   = networks.get(   link["source_network"]   )
+        target_network   = networks.get(   link["target_network"]   )
+        source_component = components.get( link["source_component"] )
+        target_component = components.get( link["target_component"] )
+        ports            = link["ports"]
+
+        interface = interfaces.get( (link["target_component"], target_network["fqn"]) )
+
+        # external sources
+        if link["source_external"]:
+            for port in ports:
+                for prefix in source_component["ipv4"]:
+                    rule = self._get_rule(
+                        rules,
+                        direction = "ingress",
+                        mode      = "cidr",
+                        group     = link["source_component"],
+                        protocol  = port["protocol"],
+                        min       = port["min"],
+                        max       = port["max"],
+                        family    = "IPv4",
+                        prefix    = prefix
+                    )
+                    interface["rules"].append(rule)
+                for prefix in source_component["ipv6"]:
+                    rule = self._get_rule(
+                        rules,
+                        direction = "ingress",
+                        mode      = "cidr",
+                        group     = link["source_component"],
+                        protocol  = port["protocol"],
+                        min       = port["min"],
+                        max       = port["max"],
+                        family    = "IPv6",
+                        prefix    = prefix
+                    )
+                    interface["rules"].append(rule)
+        # internal sources
+        else:
+            if "ipv4" in source_network:
+                for port in ports:
+                    rule = self._get_rule(
+                        rules,
+                        direction = "ingress",
+                        mode      = "group",
+                        group     = link["source_component"] + "/" + link["source_network"].split("/")[-1],
+                        protocol  = port["protocol"],
+                        min       = port["min"],
+                        max       = port["max"],
+                        family    = "IPv4",
+                        prefix    = target_network["ipv4"]["cidr"]
+                    )
+                    interface["rules"].append(rule)
+            if "ipv6" in target_network:
+                for port in ports:
+                    rule = self._get_rule(
+                        rules,
+                        direction = "egress",
+                        mode      = "group",
+                        group     = link["source_component"] + "/" + link["source_network"].split("/")[-1],
+                        protocol  = port["protocol"],
+                        min       = port["min"],
+                        max       = port["max"],
+                        family    = "IPv6",
+                        prefix    = target_network["ipv6"]["cidr"]
+                    )
+                    interface["rules"].append(rule)
+
+    # --------------------------------------------------------------------------
+    def _get_rule(self,rules,**attributes):
+        rule = Rule(**attributes)
+
+        # reuse an identical rule from the rule table
+        return rules.setdefault( rule, rule )
+
+    # --------------------------------------------------------------------------
+    def _set_node_rules(self,components):
+        for component in components.values():
             if component["type"] == "InternalComponent":
                 for index, interface in enumerate(component["interfaces"]):
                     for node in component["nodes"]:
                         node["interfaces"][index]["rules"] = interface["rules"]
 
     # --------------------------------------------------------------------------
-    def _get(self,list,fqn):
-        for item in list:
-            if item["fqn"] == fqn:
-                return item
+    def _touch(self,type,fqn):
+        # the hashes of a changed entity and the tree hashes of its parents
+        # need to be recalculated
+        if self.dirty is None:
+            return
+
+        self.dirty.add( (type, fqn) )
+
+        if type in ["Tenant","Network","InternalComponent","Node"]:
+            parts = fqn.split("/")
+            self.dirty.add( ("VNF", "/".join(parts[0:2])) )
+            if type != "Tenant":
+                self.dirty.add( ("Tenant", "/".join(parts[0:3])) )
+            if type == "Node":
+                self.dirty.add( ("InternalComponent", "/".join(parts[0:4])) )
+
+    # --------------------------------------------------------------------------
+    def _get_hash(self,type,entity,rules):
+        # hash of the compared attributes
+        attributes = Model.hashed_attributes.get(type)
+        if attributes is not None:
+            content = { attr: entity[attr] for attr in attributes }
+        else:
+            content = dict( entity )
+
+        try:
+            # the rule lists shared by a component and its nodes are hashed once
+            if type == "InternalComponent" or type == "Node":
+                content["interfaces"] = [ dict( interface, rules=self._get_rules_hash( interface.get("rules", []), rules ) )
+                                          for interface in content["interfaces"] ]
+
+            data = ENCODER.encode( content )
+        except (TypeError, ValueError):
+            # e.g. mappings with keys of different types: no hash, the
+            # entity and its parents are compared attribute by attribute
+            return None
+
+        content_hash = hashlib.blake2b( data.encode("utf-8"), digest_size=16 ).hexdigest()
+
+        # hash of the entity and the tree hashes of its children
+        children = []
+        if type == "VNF":
+            children = [ ("Tenant", item["fqn"]) for item in entity["tenants"] ]
+        elif type == "Tenant":
+            children = [ ("Network", item["fqn"]) for item in entity["networks"] ] + \
+                       [ ("InternalComponent", item["fqn"]) for item in entity["components"] ]
+        elif type == "InternalComponent":
+            children = [ ("Node", item["fqn"]) for item in entity["nodes"] ]
+
+        if not children:
+            return (content_hash, content_hash)
+
+        # children are identified by their type and fqn (which are not hashed content)
+        tree = hashlib.blake2b( content_hash.encode("utf-8"), digest_size=16 )
+        for key in children:
+            if self.hashes[key] is None:
+                return None
+            tree.update( "\0".join( [ key[0], key[1], self.hashes[key][1] ] ).encode("utf-8") + b"\0" )
+
+        return (content_hash, tree.hexdigest())
+
+    # --------------------------------------------------------------------------
+    def _get_rules_hash(self,list,rules):
+        # hashes of rule lists: id -> (list, hash)
+        entry = rules.get( id(list) )
+        if entry is None:
+            data  = ENCODER.encode( list )
+            entry = ( list, hashlib.blake2b( data.encode("utf-8"), digest_size=16 ).hexdigest() )
+            rules[ id(list) ] = entry
+
+        return entry[1]
+
+    # --------------------------------------------------------------------------
+    def _get(self,type,fqn):
+        return self.index[type].get(fqn)
+
+    # --------------------------------------------------------------------------
+    def _get_tenant_network(self,tenant,fqn):
+        # networks of the tenant itself
+        network = self.index["Network"].get(fqn)
+        if network and fqn.rsplit("/",1)[0] == tenant["fqn"]:
+            return network
+
+        # networks of the model
+        for network in self.model["networks"]:
+            if network["fqn"] == fqn:
+                return network
         return None
 
     # --------------------------------------------------------------------------
     def _set(self,list,new_item):
-        name = new_item["name"]
+        items    = self.index[new_item["type"]]
+        fqn      = new_item["fqn"]
+        old_item = items.get(fqn)
 
+        # entity is already part of the model (updated in place)
+        if old_item is new_item:
+            return
+
+        items[fqn] = new_item
+
+        # new entity
+        if old_item is None:
+            list.append( new_item )
+            return
+
+        # entity has been replaced by a new object
         for index, item in enumerate(list):
-            if item["name"] == name:
+            if item is old_item:
                 list[index] = new_item
                 return
 
         list.append( new_item )
 
     # --------------------------------------------------------------------------
-    def _remove(self,list,name):
+    def _remove(self,list,old_item):
+        items = self.index[old_item["type"]]
+        fqn   = old_item["fqn"]
+
+        # entity is not part of the model
+        if items.get(fqn) is not old_item:
+            return
+
+        self._unindex( old_item )
+
         for index, item in enumerate(list):
-            if item["name"] == name:
+            if item is old_item:
                 del list[index]
                 return
 
+    # --------------------------------------------------------------------------
+    def _unindex(self,item):
+        self.index[item["type"]].pop(item["fqn"], None)
+
+        # drop all contained entities as well
+        for listname in ["tenants","networks","components","nodes"]:
+            for subitem in item.get(listname, []):
+                if subitem.get("type") in self.index:
+                    self._unindex( subitem )
+
     # --------------------------------------------------------------------------
     def _replace(self,object1,object2,name):
         if name in object2:
@@ -11,8 +11,7 @@
 
 import os
 import sys
-import re
-import codecs
+import hashlib
 
 # ------------------------------------------------------------------------------
 #
@@ -22,61 +21,107 @@ import codecs
 class Output():
 
     # --------------------------------------------------------------------------
-    def __init__(self, directory=None):
-        """Initialize"""
+    def __init__(self, directory=None, keep=False, update=False, threads=1, stdout=None):
+        """Initialize (blocks without a file are written to stdout: sys.stdout by default)"""
 
         self.directory = directory
+        self.keep      = keep
+        self.update    = update
+        self.threads   = threads
+        self.stdout    = stdout
         self.data      = None
         self.filenames = []
         self.blocks    = []
+        self.written   = 0
+        self.skipped   = 0
+        self.executor  = None
+        self.pending   = []
 
     # --------------------------------------------------------------------------
     def write(self, data):
-        """Write blocks of data to STDOUT or a file"""
+        """Write blocks of data (text or a stream of text chunks) to STDOUT or a file"""
 
-        self.data      = data
+        self.data      = data if isinstance(data, str) else None
         self.filenames = []
         self.blocks    = []
+        self.written   = 0
+        self.skipped   = 0
 
         # check if the data contains special output statement lines:
         # ">> [path] [comments]\n" which advise to output the following
         # data to a file location indicated by the [path] argument
 
-        block    = ""
+        # updated files are committed by a pool of threads while the
+        # following blocks are being written
+        if self.update and self.threads > 1:
+            from concurrent.futures import ThreadPoolExecutor
+
+            self.executor = ThreadPoolExecutor( max_workers=self.threads )
+
+        try:
+            self._write(data)
+        finally:
+            self._finish()
+
+    # --------------------------------------------------------------------------
+    def _write(self, data):
+        """Split data into blocks and write them to their targets"""
+
+        # the lines are passed on to the target as soon as they have been read,
+        # a target is only opened once the block contains a non-empty line
+        stream   = None
         filename = ""
-        for line in self.data.splitlines():
-            # determine new filename: ">> [filename] [comments]"
-            match = re.match(">> ([^ ]*)(.*)", line)
-            if match:
-                # write the existing block
-                if block != "":
-                    self.write2(filename, block)
-
-                    # reset block and file name
-                    block = ""
-
-                # set new file name
-                filename = match.group(1)
-            else:
-                if block == "":
-                    block = line
+        try:
+            for line in Output.lines(data):
+                # determine new filename: ">> [filename] [comments]"
+                if line.startswith(">> "):
+                    # finish the existing block
+                    if stream is not None:
+                        self._close(stream)
+                        stream = None
+
+                    # set new file name
+                    filename = line[3:].split(" ", 1)[0]
+
+                # skip leading empty lines of a block
+                elif stream is None:
+                    if line != "":
+                        stream = self._open(filename)
+                        self._append(stream, line, first=True)
+
                 else:
-                    block += "\n" + line
+                    self._append(stream, line)
+        except BaseException:
+            if isinstance(stream, UpdateFile):
+                stream.discard()
+            elif stream is not None and stream is not self._get_stdout():
+                stream.close()
+            raise
 
-        # write last block
-        self.write2(filename, block)
+        # finish last block (which is written even if it is empty)
+        if stream is None:
+            stream = self._open(filename)
+            self._append(stream, "", first=True)
+        self._close(stream)
 
     # --------------------------------------------------------------------------
     def write2(self, filename, block):
         """Write block to STDOUT or a file"""
 
-        self.blocks.append( block )
+        stream = self._open(filename)
+        self._append(stream, block, first=True)
+        self._close(stream)
+        self._finish()
+
+    # --------------------------------------------------------------------------
+    def _open(self, filename):
+        """Open the target of a block: STDOUT or a file"""
 
         # write to stdout if no filename has been provided
         if filename == "" or filename is None:
             self.filenames.append( "STDOUT" )
 
-            print( block )
+            stream = self._get_stdout()
 
         # write to file
         else:
@@ -87,15 +132,140 @@ class Output():
 
             self.filenames.append( filepath )
 
-            # write block as text file
-            with codecs.open(filepath, "w", "utf-8") as stream:
-                stream.write(block)
+            if self.update:
+                stream = UpdateFile(filepath)
+            else:
+                stream = open(filepath, "w", encoding="utf-8", newline="")
+
+        if self.keep:
+            self.blocks.append( [] )
+
+        return stream
+
+    # --------------------------------------------------------------------------
+    def _append(self, stream, line, first=False):
+        """Write a line to the target of the current block"""
+
+        # lines written to stdout are terminated immediately (like print)
+        if stream is self._get_stdout():
+            stream.write(line + "\n")
+        elif first:
+            stream.write(line)
+        else:
+            stream.write("\n" + line)
+
+        if self.keep:
+            self.blocks[-1].append( line )
+
+    # --------------------------------------------------------------------------
+    def _close(self, stream):
+        """Finish the current block"""
+
+        if isinstance(stream, UpdateFile):
+            stream.close()
+
+            if self.executor:
+                self.pending.append( self.executor.submit( stream.commit ) )
+            else:
+                self.pending.append( stream.commit() )
+
+        elif stream is not self._get_stdout():
+            stream.close()
+
+            self.written += 1
+
+        if self.keep:
+            self.blocks[-1] = "\n".join( self.blocks[-1] )
+
+    # --------------------------------------------------------------------------
+    def _finish(self):
+        """Wait until all updated files have been committed and count them"""
+
+        pending      = self.pending
+        self.pending = []
+
+        try:
+            for result in pending:
+                if not isinstance(result, bool):
+                    result = result.result()
+
+                if result:
+                    self.written += 1
+                else:
+                    self.skipped += 1
+        finally:
+            if self.executor:
+                self.executor.shutdown()
+                self.executor = None
+
+    # --------------------------------------------------------------------------
+    @staticmethod
+    def lines(data):
+        """Split text or a stream of text chunks into lines"""
+
+        if isinstance(data, str):
+            data = [data]
+
+        pending = ""
+        for chunk in data:
+            pending += chunk
+
+            lines = pending.splitlines(True)
+            if not lines:
+                continue
+
+            # keep the last line until it is complete ("\r\n" may be split)
+            pending = lines.pop()
+            if pending.splitlines()[0] != pending and not pending.endswith("\r"):
+                lines.append( pending )
+                pending = ""
+
+            for line in lines:
+                yield line.splitlines()[0]
+
+        if pending:
+            yield pending.splitlines()[0]
 
     # --------------------------------------------------------------------------
     def getDirectory(self):
         """Provide directory"""
         return self.directory
 
+    # --------------------------------------------------------------------------
+    def getKeep(self):
+        """Provide keep flag"""
+        return self.keep
+
+    # --------------------------------------------------------------------------
+    def getUpdate(self):
+        """Provide update flag"""
+        return self.update
+
+    # --------------------------------------------------------------------------
+    def _get_stdout(self):
+        """Provide the target of blocks without a file"""
+        return sys.stdout if self.stdout is None else self.stdout
+
+    # --------------------------------------------------------------------------
+    def getStdout(self):
+        """Provide target of blocks without a file (None: sys.stdout)"""
+        return self.stdout
+
+    # --------------------------------------------------------------------------
+    def getThreads(self):
+        """Provide number of threads committing updated files"""
+        return self.threads
+
+    # --------------------------------------------------------------------------
+    def getWritten(self):
+        """Provide number of files written by the last write"""
+        return self.written
+
+    # --------------------------------------------------------------------------
+    def getSkipped(self):
+        """Provide number of unchanged files skipped by the last write"""
+        return self.skipped
+
     # --------------------------------------------------------------------------
     def getData(self):
         """Provide raw data"""
@@ -108,5 +278,93 @@ class Output():
 
     # --------------------------------------------------------------------------
     def getBlocks(self):
-        """Provide blocks"""
+        """Provide blocks (only retained if requested)"""
         return self.blocks
+
+# ------------------------------------------------------------------------------
+#
+# Class UpdateFile
+#
+# ------------------------------------------------------------------------------
+class UpdateFile():
+
+    # --------------------------------------------------------------------------
+    def __init__(self, filepath):
+        """Initialize (the content is written to a temporary file first)"""
+
+        self.filepath = filepath
+
+        # the temporary file gets the permissions of a new file (derived
+        # from the umask of the process like those of files opened for writing)
+        directory, name = os.path.split( filepath )
+        while True:
+            self.temppath = os.path.join( directory, ".{}.{}.tmp".format( name, os.urandom(6).hex() ) )
+            try:
+                handle = os.open( self.temppath, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666 )
+                break
+            except FileExistsError:
+                continue
+
+        self.stream = os.fdopen( handle, "w", encoding="utf-8", newline="" )
+
+    # --------------------------------------------------------------------------
+    def write(self, text):
+        """Write text to the temporary file"""
+        self.stream.write( text )
+
+    # --------------------------------------------------------------------------
+    def close(self):
+        """Close the temporary file"""
+        self.stream.close()
+
+    # --------------------------------------------------------------------------
+    def commit(self):
+        """Replace the file atomically unless its content is unchanged"""
+
+        try:
+            try:
+                status = os.stat( self.filepath )
+            except FileNotFoundError:
+                status = None
+
+            # skip unchanged files
+            if status is not None and status.st_size == os.path.getsize( self.temppath ) and \
+               UpdateFile.digest( self.filepath ) == UpdateFile.digest( self.temppath ):
+                os.remove( self.temppath )
+                return False
+
+            # keep the permissions of an existing file
+            if status is not None:
+                os.chmod( self.temppath, status.st_mode & 0o7777 )
+
+            os.replace( self.temppath, self.filepath )
+            return True
+        except BaseException:
+            self.discard()
+            raise
+
+    # --------------------------------------------------------------------------
+    def discard(self):
+        """Close and remove the temporary file"""
+
+        self.stream.close()
+        try:
+            os.remove( self.temppath )
+        except FileNotFoundError:
+            pass
+
+    # --------------------------------------------------------------------------
+    @staticmethod
+    def digest(filepath):
+        """Provide the hash of the content of a file"""
+
+        digest = hashlib.sha256()
+        with open( filepath, "rb" ) as stream:
+            for block in iter( lambda: stream.read(1 << 20), b"" ):
+                digest.update( block )
+        return digest.hexdigest()
+
+    # --------------------------------------------------------------------------
+    def getFilepath(self):
+        """Provide filepath"""
+        return self.filepath
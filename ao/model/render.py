@@ -7,12 +7,13 @@
 #
 # A class to provide functionality for rendering templates.
 #
+# jinja2 is imported when the first renderer is created and templates are
+# compiled when they are used for the first time.
+#
 # ------------------------------------------------------------------------------
 
 import os
-import jinja2
-import yaml
-import glob
+from ao.model import backend
 
 # ------------------------------------------------------------------------------
 #
@@ -22,48 +23,49 @@ import glob
 class Render():
 
     # --------------------------------------------------------------------------
-    def __init__(self, version="V0.1.1", directory=None):
+    def __init__(self, version="V0.1.1", directory=None, cache=None):
         """Initialize"""
+        import jinja2
 
         if directory is None:
             self.directory = os.path.dirname(__file__)
         else:
             self.directory = directory
         self.version   = version
+        self.cache     = cache
         self.templates = {}
         self.renderers = {}
-        self.dumper    = yaml.dumper.SafeDumper
-
-        # initialize yaml dumper
-        self.dumper.ignore_aliases = lambda self, data: True
 
-        # initialize the jinja2 environment
-        env = jinja2.Environment(
+        # initialize the persistent cache of compiled templates
+        bytecode_cache = None
+        if cache:
+            try:
+                cache_dir = os.path.join( cache, "jinja2-" + jinja2.__version__ )
+                os.makedirs( cache_dir, exist_ok=True )
+
+                bytecode_cache = jinja2.FileSystemBytecodeCache( cache_dir )
+            except OSError:
+                bytecode_cache = None
+
+        # initialize the jinja2 environment (templates are compiled on demand)
+        self.env = jinja2.Environment(
+            loader=jinja2.FileSystemLoader( os.path.join( self.directory, self.version ) ),
+            bytecode_cache=bytecode_cache,
             trim_blocks=True,
             lstrip_blocks=True,
             extensions=[ 'jinja2.ext.loopcontrols' ]
         )
 
-        # load templates
-        for template_file in glob.glob( '{}/{}/*.j2'.format( self.directory, self.version ) ):
-            template_name = os.path.basename( template_file )[:-3]
-            with open( template_file, 'r' ) as stream:
-                template = stream.read()
-                renderer = env.from_string( template )
-
-                self.templates[template_name] = template
-                self.renderers[template_name] = renderer
-
     # --------------------------------------------------------------------------
     def render(self, data, template_name=None):
         """Render data or dump as yaml"""
 
         # dump as yaml
         if template_name is None:
-            txt = yaml.dump( data, default_flow_style=False, Dumper=noalias_dumper)
+            txt = backend.dump( data, default_flow_style=False )
 
         # unknown template
-        elif not template_name in self.templates:
+        elif self._get_renderer( template_name ) is None:
             txt = "unknown template"
 
         # render the data
@@ -74,6 +76,58 @@ class Render():
         # return the results
         return txt
 
+    # --------------------------------------------------------------------------
+    def generate(self, data, template_name=None):
+        """Render data or dump as yaml as a stream of text chunks"""
+
+        # dump as yaml
+        if template_name is None:
+            yield backend.dump( data, default_flow_style=False )
+
+        # unknown template
+        elif self._get_renderer( template_name ) is None:
+            yield "unknown template"
+
+        # render the data piece by piece
+        else:
+            renderer = self.renderers[template_name]
+            yield from renderer.generate( data )
+
+    # --------------------------------------------------------------------------
+    def render_many(self, data, template_names, threads=1):
+        """Render data with several templates (optionally in parallel threads)"""
+
+        # compile all templates before they are shared between threads
+        for template_name in template_names:
+            self._get_renderer( template_name )
+
+        if threads > 1 and len(template_names) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor( max_workers=threads ) as executor:
+                results = list( executor.map( lambda name: self.render( data, name ), template_names ) )
+        else:
+            results = [ self.render( data, template_name ) for template_name in template_names ]
+
+        # return (template name, result) tuples in the sequence of the names
+        return list( zip( template_names, results ) )
+
+    # --------------------------------------------------------------------------
+    def _get_renderer(self, template_name):
+        """Provide the compiled template"""
+
+        if not template_name in self.renderers:
+            import jinja2
+
+            try:
+                renderer = self.env.get_template( template_name + ".j2" )
+            except jinja2.TemplateNotFound:
+                return None
+
+            self.renderers[template_name] = renderer
+
+        return self.renderers[template_name]
+
     # --------------------------------------------------------------------------
     def getDirectory(self):
         """Provide directory"""
@@ -84,7 +138,17 @@ class Render():
         """Provide version"""
         return self.version
 
+    # --------------------------------------------------------------------------
+    def getCache(self):
+        """Provide cache directory"""
+        return self.cache
+
     # --------------------------------------------------------------------------
     def getTemplates(self):
         """Provide templates"""
+        for template_file in self.env.list_templates( extensions=["j2"] ):
+            template_name = template_file[:-3]
+            if not template_name in self.templates:
+                source, _, _ = self.env.loader.get_source( self.env, template_file )
+                self.templates[template_name] = source
         return self.templates
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#
+# serialize.py:
+#
+# Functions to save and load model trees in a compact binary format:
+#
+#   "AOMODEL" [format version: 1 byte] [schema length: 1 byte] [schema]
+#   [crc32 of the data: 4 bytes] [pickle protocol 5 data]
+#
+# Shared objects of a model (e.g. the security rules of the interfaces) are
+# stored only once. Only the classes used by model trees can be loaded.
+#
+# ------------------------------------------------------------------------------
+
+import io
+import zlib
+import pickle
+from ao.model.model import Model, Rule
+
+MAGIC  = b"AOMODEL"
+FORMAT = 1
+
+# ------------------------------------------------------------------------------
+#
+# Class Unpickler: restricted to the classes of model trees
+#
+# ------------------------------------------------------------------------------
+class Unpickler(pickle.Unpickler):
+
+    # --------------------------------------------------------------------------
+    def find_class(self, module, name):
+        """Provide the classes which may be part of a model tree"""
+
+        if module == Rule.__module__ and name == Rule.__name__:
+            return Rule
+
+        raise pickle.UnpicklingError( "Unsupported class: {}.{}".format(module, name) )
+
+# ------------------------------------------------------------------------------
+def dumps(tree):
+    """Convert a model tree into bytes"""
+
+    schema = tree["schema"].encode("utf-8")
+    data   = pickle.dumps( tree, protocol=5 )
+
+    return MAGIC + bytes( [FORMAT, len(schema)] ) + schema + zlib.crc32( data ).to_bytes( 4, "big" ) + data
+
+# ------------------------------------------------------------------------------
+def loads(data):
+    """Convert bytes into a model tree"""
+
+    return load( io.BytesIO( data ) )
+
+# ------------------------------------------------------------------------------
+def dump(tree, stream):
+    """Write a model tree to a binary stream"""
+    stream.write( dumps( tree ) )
+
+# ------------------------------------------------------------------------------
+def load(stream):
+    """Read a model tree from a binary stream"""
+
+    try:
+        return _load( stream )
+    except AttributeError:
+        raise
+    except Exception as exc:
+        # corrupt data may raise almost any exception while it is unpickled
+        raise AttributeError( "Invalid model data: {}".format(exc) )
+
+# ------------------------------------------------------------------------------
+def _load(stream):
+    # check the header
+    header = stream.read( len(MAGIC) + 2 )
+    if len(header) != len(MAGIC) + 2 or not header.startswith( MAGIC ):
+        raise AttributeError( "Invalid model data" )
+
+    if header[-2] != FORMAT:
+        raise AttributeError( "Unsupported model format" )
+
+    schema = stream.read( header[-1] ).decode("utf-8")
+    if not schema in Model.supported_schemas:
+        raise AttributeError( "Unsupported schema" )
+
+    # check the data
+    checksum = stream.read( 4 )
+    data     = stream.read()
+    if zlib.crc32( data ).to_bytes( 4, "big" ) != checksum:
+        raise AttributeError( "Invalid model data: checksum mismatch" )
+
+    # read the model tree
+    tree = Unpickler( io.BytesIO( data ) ).load()
+
+    if not isinstance( tree, dict ) or tree.get("schema") != schema:
+        raise AttributeError( "Invalid model data" )
+
+    return tree
+
+# ------------------------------------------------------------------------------
+def save(model, filename):
+    """Save a model to a file"""
+
+    with open( filename, "wb" ) as stream:
+        dump( model.getModel(), stream )
+
+# ------------------------------------------------------------------------------
+def restore(filename):
+    """Load a model from a file"""
+
+    with open( filename, "rb" ) as stream:
+        tree = load( stream )
+
+    model = Model( context=tree["context"], schema=tree["schema"] )
+    model.set_model( tree )
+
+    return model
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#
+# store.py:
+#
+# A class to provide a persistent store of model snapshots: every version of
+# a model is stored under its context and version number.
+#
+# ------------------------------------------------------------------------------
+
+import os
+import time
+import sqlite3
+from ao.model       import serialize
+from ao.model.model import Model
+from ao.model.delta import Delta
+
+# ------------------------------------------------------------------------------
+#
+# Class Store
+#
+# ------------------------------------------------------------------------------
+class Store():
+
+    # --------------------------------------------------------------------------
+    def __init__(self, filename):
+        """Initialize (the store file is opened on first use)"""
+
+        self.filename   = filename
+        self.connection = None
+
+    # --------------------------------------------------------------------------
+    def save(self, model):
+        """Store the current version of a model"""
+
+        tree = model.getModel()
+        data = serialize.dumps( tree )
+
+        connection = self._connect()
+        with connection:
+            connection.execute( "INSERT OR REPLACE INTO snapshots (context, version, schema, created, data) "
+                                "VALUES (?, ?, ?, ?, ?)",
+                                (tree["context"], tree["version"], tree["schema"], time.time(), data) )
+
+    # --------------------------------------------------------------------------
+    def load(self, context="default", version=None):
+        """Provide a stored version of a model (the latest one if no version is given)"""
+
+        connection = self._connect()
+        if version is None:
+            row = connection.execute( "SELECT data FROM snapshots WHERE context = ? "
+                                      "ORDER BY version DESC LIMIT 1", (context,) ).fetchone()
+        else:
+            row = connection.execute( "SELECT data FROM snapshots WHERE context = ? AND version = ?",
+                                      (context, version) ).fetchone()
+
+        # unknown snapshot
+        if row is None:
+            return None
+
+        tree = serialize.loads( row[0] )
+
+        model = Model( context=tree["context"], schema=tree["schema"] )
+        model.set_model( tree )
+
+        return model
+
+    # --------------------------------------------------------------------------
+    def delta(self, model, version=None, details=False):
+        """Provide the difference between a stored version and a model"""
+
+        stored = self.load( model.getModel()["context"], version )
+        if stored is None:
+            raise AttributeError( "Unknown snapshot" )
+
+        return Delta( stored, model, details=details )
+
+    # --------------------------------------------------------------------------
+    def remove(self, context="default", version=None):
+        """Remove one or all stored versions of a model"""
+
+        connection = self._connect()
+        with connection:
+            if version is None:
+                connection.execute( "DELETE FROM snapshots WHERE context = ?", (context,) )
+            else:
+                connection.execute( "DELETE FROM snapshots WHERE context = ? AND version = ?", (context, version) )
+
+    # --------------------------------------------------------------------------
+    def close(self):
+        """Close the store file"""
+
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    # --------------------------------------------------------------------------
+    def _connect(self):
+        """Open the store file"""
+
+        if self.connection is None:
+            directory = os.path.dirname( self.filename )
+            if directory:
+                os.makedirs( directory, exist_ok=True )
+
+            self.connection = sqlite3.connect( self.filename, timeout=30 )
+            self.connection.execute( "CREATE TABLE IF NOT EXISTS snapshots "
+                                     "(context TEXT, version INTEGER, schema TEXT, created REAL, data BLOB, "
+                                     "PRIMARY KEY (context, version))" )
+
+        return self.connection
+
+    # --------------------------------------------------------------------------
+    def getFilename(self):
+        """Provide filename"""
+        return self.filename
+
+    # --------------------------------------------------------------------------
+    def getContexts(self):
+        """Provide the contexts of all stored models"""
+
+        connection = self._connect()
+        rows = connection.execute( "SELECT DISTINCT context FROM snapshots ORDER BY context" ).fetchall()
+        return [ row[0] for row in rows ]
+
+    # --------------------------------------------------------------------------
+    def getVersions(self, context="default"):
+        """Provide the stored versions of a model"""
+
+        connection = self._connect()
+        rows = connection.execute( "SELECT version FROM snapshots WHERE context = ? ORDER BY version",
+                                   (context,) ).fetchall()
+        return [ row[0] for row in rows ]
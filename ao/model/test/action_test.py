@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from ao.model.model         import Model
+from ao.model.delta         import Delta
+from ao.model.action        import Action
+from ao.model.test.topology import get_topology
+from unittest               import TestCase, expectedFailure
+from pytest                 import mark
+
+class ActionTest(TestCase):
+    @staticmethod
+    def get_waves(action):
+        return { (entry["type"], entry["fqn"]): entry["wave"] for entry in action.getModel()["actions"] }
+
+    def test__01__action__create__pass(self):
+        # run - test should fail if any exception occurs
+        try:
+            model1 = Model( context="test" )
+            model2 = Model( context="test" )
+            model2.set( get_topology(components=10, nodes=2) )
+
+            action = Action( Delta( model1, model2 ) )
+            waves  = ActionTest.get_waves( action )
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check - containers and networks before components before nodes,
+        # the ring of mutually dependent components forms a single wave
+        self.assertEqual( len( waves ), 1 + 1 + 4 + 10 + 20 + 2 )
+        self.assertEqual( [ len( wave ) for wave in action.getWaves() ], [1, 1, 4, 10, 20 + 2] )
+        self.assertLess( waves[("Network", "/Bench/DC/oam")], waves[("InternalComponent", "/Bench/DC/c0")] )
+        self.assertLess( waves[("InternalComponent", "/Bench/DC/c0")], waves[("ExternalComponent", "/ext0")] )
+        self.assertLess( waves[("InternalComponent", "/Bench/DC/c0")], waves[("Node", "/Bench/DC/c0/n0")] )
+
+    def test__02__action__remove_before_add__pass(self):
+        # prepare - replace one node and remove a component
+        topology1 = get_topology(components=3, nodes=1)
+        topology2 = get_topology(components=3, nodes=1)
+        templates = topology2["topology_template"]["node_templates"]
+        templates["/Bench/DC/c1/n5"] = templates.pop("/Bench/DC/c1/n0")
+        templates["/Bench/DC/c1/n5"]["properties"]["name"] = "n5"
+        del templates["/Bench/DC/c2/n0"]
+        del templates["/Bench/DC/c2"]
+        templates["/Bench/DC/c1"]["properties"]["dependencies"] = []
+
+        # run - test should fail if any exception occurs
+        try:
+            model1 = Model( context="test" )
+            model2 = Model( context="test" )
+            model1.set( topology1 )
+            model2.set( topology2 )
+
+            waves = ActionTest.get_waves( Action( Delta( model1, model2 ) ) )
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check
+        self.assertLess( waves[("Node", "/Bench/DC/c1/n0")], waves[("Node", "/Bench/DC/c1/n5")] )
+        self.assertLess( waves[("Node", "/Bench/DC/c2/n0")], waves[("InternalComponent", "/Bench/DC/c2")] )
+
+    def test__03__action__remove_after_detach__pass(self):
+        # prepare - the components drop the network m2m2 and c1 drops its provider c2
+        topology1 = get_topology(components=3, nodes=1)
+        topology2 = get_topology(components=3, nodes=1)
+        templates = topology2["topology_template"]["node_templates"]
+        del templates["/Bench/DC/m2m2"]
+        del templates["/Bench/DC/c2/n0"]
+        del templates["/Bench/DC/c2"]
+        templates["/Bench/DC/c1"]["properties"]["dependencies"] = []
+        for name in ["/Bench/DC/c0", "/Bench/DC/c1", "/Bench/DC/c0/n0", "/Bench/DC/c1/n0"]:
+            properties = templates[name]["properties"]
+            for listname in ["interfaces", "services", "dependencies"]:
+                if listname in properties:
+                    properties[listname] = [ entry for entry in properties[listname] if entry["network"] != "m2m2" ]
+
+        # run - test should fail if any exception occurs
+        try:
+            model1 = Model( context="test" )
+            model2 = Model( context="test" )
+            model1.set( topology1 )
+            model2.set( topology2 )
+
+            waves = ActionTest.get_waves( Action( Delta( model1, model2 ) ) )
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check - the network and the provider are removed after the changes detaching from them
+        self.assertLess( waves[("InternalComponent", "/Bench/DC/c0")], waves[("Network", "/Bench/DC/m2m2")] )
+        self.assertLess( waves[("Node", "/Bench/DC/c1/n0")], waves[("Network", "/Bench/DC/m2m2")] )
+        self.assertLess( waves[("InternalComponent", "/Bench/DC/c1")], waves[("InternalComponent", "/Bench/DC/c2")] )
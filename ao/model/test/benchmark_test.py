@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from timeit                 import repeat
+from glob                   import glob
+from os                     import path, environ
+from subprocess             import run
+from sys                    import executable
+from ao.model               import backend, serialize
+from ao.model.model         import Model
+from ao.model.delta         import Delta
+from ao.model.test.topology import get_topology
+from unittest               import TestCase, expectedFailure, skipUnless
+from pytest                 import mark
+from yaml                   import __with_libyaml__
+
+class BenchmarkTest(TestCase):
+    @staticmethod
+    def measure(function, number=1, repetitions=3):
+        # best of several runs to reduce the noise
+        return min( repeat(function, number=number, repeat=repetitions) )
+
+    @staticmethod
+    def import_times(statement):
+        # cumulative import times (in microseconds) of the modules imported
+        # directly by a statement in a fresh interpreter: module name -> time
+        # and the output of the statement
+        root = path.join(path.dirname(__file__), "..", "..", "..")
+        env  = dict(environ, PYTHONPATH=path.abspath(root))
+        env.pop("AO_SERVICE", None)
+
+        process = run([executable, "-X", "importtime", "-c", statement],
+                      env=env, capture_output=True, text=True, check=True)
+
+        times = {}
+        for line in process.stderr.splitlines():
+            if line.startswith("import time:") and not "cumulative" in line:
+                _, cumulative, name = line[12:].split("|")
+                if not name.startswith("  "):
+                    times[name.strip()] = int(cumulative)
+        return times, process.stdout
+
+    def test__01__benchmark__references_scale_linearly__pass(self):
+        # prepare
+        small = Model( context="small" )
+        large = Model( context="large" )
+        small.set( get_topology(components=1000) )
+        large.set( get_topology(components=4000) )
+
+        # run
+        time_small = BenchmarkTest.measure( small._set_references )
+        time_large = BenchmarkTest.measure( large._set_references )
+
+        print( "references: 1000 components {:.4f}s, 4000 components {:.4f}s".format(time_small, time_large) )
+
+        # check - four times the links should not take (much) more than four
+        # times as long, a quadratic algorithm needs sixteen times as long
+        self.assertLess( time_large, 8 * time_small )
+
+    def test__02__benchmark__incremental_references__pass(self):
+        # prepare
+        model     = Model( context="bench" )
+        model.set( get_topology(components=1000, nodes=1) )
+        templates = get_topology(components=1000, nodes=1)["topology_template"]["node_templates"]
+        change    = { "topology_template": { "node_templates": { "/Bench/DC/c10": templates["/Bench/DC/c10"] } } }
+
+        # run
+        time_incremental = BenchmarkTest.measure( lambda: model.set( change ) )
+        time_full        = BenchmarkTest.measure( lambda: model.set( change, incremental=False ) )
+
+        print( "update of one component: incremental {:.4f}s, full {:.4f}s".format(time_incremental, time_full) )
+
+        # check
+        self.assertLess( time_incremental, time_full / 4 )
+
+    @skipUnless(__with_libyaml__, "PyYAML has been built without libyaml")
+    def test__03__benchmark__yaml_backends__pass(self):
+        # prepare
+        directory = path.join(path.dirname(__file__), "..", "..", "data", "test", "V0.1.1")
+        documents = []
+        for filename in sorted( glob( path.join(directory, "*.yaml") ) ):
+            with open(filename, "r") as stream:
+                documents.append( stream.read() )
+
+        def load():
+            return [ backend.load(document) for document in documents ]
+
+        def dump(objects):
+            return [ backend.dump(obj, default_flow_style=False) for obj in objects ]
+
+        # run
+        timings = {}
+        results = {}
+        try:
+            for name in ["python", "libyaml"]:
+                backend.set_backend(name)
+                objects       = load()
+                results[name] = (objects, dump(objects))
+                timings[name] = ( BenchmarkTest.measure( load, number=5 ),
+                                  BenchmarkTest.measure( lambda: dump(objects), number=5 ) )
+        finally:
+            backend.set_backend()
+
+        for name, (time_load, time_dump) in timings.items():
+            print( "{}: load {:.4f}s, dump {:.4f}s".format(name, time_load, time_dump) )
+
+        # check - both implementations agree and libyaml is faster
+        self.assertEqual( results["python"], results["libyaml"] )
+        self.assertLess( timings["libyaml"][0], timings["python"][0] )
+        self.assertLess( timings["libyaml"][1], timings["python"][1] )
+
+    def test__04__benchmark__delta_scales_linearly__pass(self):
+        # prepare - two models with 5000 and two models with 20000 nodes
+        models = {}
+        for components in [50, 200]:
+            topology2 = get_topology(components=components, nodes=100)
+            templates = topology2["topology_template"]["node_templates"]
+            templates["/Bench/DC/c1"]["properties"]["image"]    = "centos"
+            templates["/Bench/DC/c2/n1"]["properties"]["state"] = "stopped"
+
+            model1 = Model( context="bench" )
+            model2 = Model( context="bench" )
+            model1.set( get_topology(components=components, nodes=100) )
+            model2.set( topology2 )
+            models[components] = (model1, model2)
+
+        def compare(model1, model2):
+            # the models cache their hashes, every run calculates them again
+            model1.dirty = model2.dirty = None
+            return Delta( model1, model2 )
+
+        # run
+        time_small = BenchmarkTest.measure( lambda: compare( *models[50] ) )
+        time_large = BenchmarkTest.measure( lambda: compare( *models[200] ) )
+
+        print( "delta: 5000 nodes {:.4f}s, 20000 nodes {:.4f}s".format(time_small, time_large) )
+
+        delta   = Delta( *models[200] ).getModel()
+        tenant  = delta["vnfs"][0]["tenants"][0]
+        changes = [ component["fqn"] for component in tenant["components"] if component["action"] == "change" ]
+        nodes   = [ node["fqn"] for component in tenant["components"] for node in component["nodes"] if node["action"] == "change" ]
+
+        # check
+        self.assertEqual( changes, ["/Bench/DC/c1"] )
+        self.assertEqual( nodes,   ["/Bench/DC/c2/n1"] )
+        self.assertLess( time_large, 8 * time_small )
+
+    def test__05__benchmark__binary_models__pass(self):
+        # prepare
+        descriptor = backend.dump( get_topology(components=100, nodes=20), sort_keys=False )
+        model      = Model( context="bench" )
+        model.set( backend.load( descriptor ) )
+        data       = serialize.dumps( model.getModel() )
+
+        def rebuild():
+            Model( context="bench" ).set( backend.load( descriptor ) )
+
+        def restore():
+            Model( context="bench" ).set_model( serialize.loads( data ) )
+
+        # run
+        time_rebuild = BenchmarkTest.measure( rebuild )
+        time_restore = BenchmarkTest.measure( restore )
+
+        print( "2000 nodes: rebuild {:.4f}s, binary restore {:.4f}s".format(time_rebuild, time_restore) )
+
+        # check
+        self.assertLess( time_restore, time_rebuild / 10 )
+
+    def test__06__benchmark__cli_import_time__pass(self):
+        # prepare - the heavy libraries are imported after the command line tools
+        libraries = ["jinja2", "jsonschema", "yaml"]
+        statement = ( "import sys, ao.cli.generator, ao.cli.validator, ao.cli.splitter; "
+                      "print(sorted(name for name in {} if name in sys.modules)); "
+                      "import {}".format(libraries, ", ".join(libraries)) )
+
+        # run - best of several interpreters
+        runs = [ BenchmarkTest.import_times(statement) for _ in range(3) ]
+
+        # check - the tools do not import the heavy libraries
+        for _, output in runs:
+            self.assertEqual( output.strip(), "[]" )
+
+        time_cli   = min( sum( times[name] for name in ["ao.cli.generator","ao.cli.validator","ao.cli.splitter"] ) for times, _ in runs )
+        time_heavy = min( sum( times[name] for name in libraries ) for times, _ in runs )
+
+        print( "import: command line tools {:.4f}s, jinja2/jsonschema/yaml {:.4f}s".format(time_cli / 1e6, time_heavy / 1e6) )
+
+        # check - the tools import faster than the libraries (about twice as
+        # fast even if the package has not been byte compiled)
+        self.assertLess( time_cli, time_heavy )
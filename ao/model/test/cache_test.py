@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from os             import path
+from tempfile       import TemporaryDirectory
+from ao.model.cache import Cache
+from unittest       import TestCase, expectedFailure
+from pytest         import mark
+
+class CacheTest(TestCase):
+
+    def test__01__cache__lru_eviction__pass(self):
+        # run - test should fail if any exception occurs
+        try:
+            with TemporaryDirectory() as tmp:
+                filename = path.join(tmp, "cache", "test.db")
+
+                cache = Cache(filename, size=2)
+                cache.set("a", [1])
+                cache.set("b", {"x": "y"})
+                cache.flush()
+                cache.get("a")
+                cache.set("c", None)
+                cache.flush()
+                cache.close()
+
+                cache = Cache(filename, size=2)
+                a = cache.get("a")
+                b = cache.get("b")
+                c = cache.get("c")
+                cache.close()
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check - "b" has been used least recently
+        self.assertEqual(a, [1])
+        self.assertIsNone(b)
+        self.assertIsNone(c)
+
+    def test__02__cache__unusable_file__pass(self):
+        # run - test should fail if any exception occurs
+        try:
+            with TemporaryDirectory() as tmp:
+                cache = Cache(tmp)
+                cache.set("a", [1])
+                value = cache.get("a")
+                cache.close()
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check
+        self.assertIsNone(value)
+        self.assertTrue(cache.disabled)
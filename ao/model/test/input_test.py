@@ -62,3 +62,21 @@ class InputTest(TestCase):
         self.assertIsNotNone(filename)
         self.assertIsNotNone(data)
         self.assertIsNotNone(obj)
+
+    def test__03__model__read_file_without_copy__pass(self):
+        # prepare
+        filepath  = path.join(path.dirname(__file__), "fixtures")
+
+        # run - test should fail if any exception occurs
+        try:
+            stream = Input(directory=filepath, keep=False)
+            stream.read("clearwater1.yaml")
+
+            data = stream.getData()
+            obj  = stream.getObject()
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check
+        self.assertIsNone(data)
+        self.assertIn("topology_template", obj)
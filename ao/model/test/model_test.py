@@ -9,6 +9,7 @@ from ao.model.model    import Model
 from ao.model.render   import Render
 from ao.model.delta    import Delta
 from ao.model.action   import Action
+from ao.model.test.topology import get_topology
 from unittest          import TestCase, expectedFailure
 from pytest            import mark
 
@@ -104,3 +105,222 @@ class ModelTest(TestCase):
         self.assertIsNotNone( delta_model  )
         self.assertIsNotNone( delta_model1 )
         self.assertIsNotNone( delta_model2 )
+
+    def test__02__model__index__pass(self):
+        # prepare
+        clearwater1 = ModelTest.parse_yaml("clearwater1")
+        removal     = ModelTest.parse_yaml("clearwater2")
+        bono        = removal["topology_template"]["node_templates"]["/Clearwater/SOL/bono"]
+        bono["properties"]["state"] = "undefined"
+
+        # run - test should fail if any exception occurs
+        try:
+            model = Model( context="test" )
+            model.set( clearwater1 )
+            before = dict( model.index["InternalComponent"] )
+
+            model.set( removal )
+            after  = dict( model.index["InternalComponent"] )
+            tree   = model.getModel()
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check
+        self.assertIn(    "/Clearwater/SOL/bono", before )
+        self.assertNotIn( "/Clearwater/SOL/bono", after )
+        self.assertEqual( len(before), len(after) + 1 )
+
+        components = tree["vnfs"][0]["tenants"][0]["components"]
+        self.assertEqual( sorted(c["fqn"] for c in components), sorted(after) )
+        for component in components:
+            self.assertIs( after[component["fqn"]], component )
+
+    def test__03__model__incremental_references__pass(self):
+        # prepare
+        templates = get_topology(components=20, nodes=1)["topology_template"]["node_templates"]
+        changes   = ["/Bench/DC/c3", "/Bench/DC/c4/n0", "/Bench/DC/svc1", "/ext0"]
+
+        templates["/Bench/DC/c3"]["properties"]["services"][0]["ports"][0]["max"] = 1001
+        templates["/Bench/DC/svc1"]["properties"]["ipv4"]["cidr"] = "10.9.0.0/16"
+
+        # run - test should fail if any exception occurs
+        try:
+            model = Model( context="test", check=True )
+            model.set( get_topology(components=20, nodes=1) )
+
+            # partial updates are compared against a full recalculation
+            for fqn in changes:
+                model.set( { "topology_template": { "node_templates": { fqn: templates[fqn] } } } )
+
+            reference = Model( context="test" )
+            reference.set( get_topology(components=20, nodes=1) )
+            reference.set( { "topology_template": { "node_templates": { fqn: templates[fqn] for fqn in changes } } },
+                           incremental=False )
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check
+        self.assertEqual( model._get_interface_rules(), reference._get_interface_rules() )
+
+    def test__04__model__shared_rules__pass(self):
+        # run - test should fail if any exception occurs
+        try:
+            model = Model( context="test" )
+            model.set( get_topology(components=20, nodes=2) )
+
+            rules = [ rule for _, interface_rules in model._get_interface_rules()[1:]
+                           for rule in interface_rules ]
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check - identical rules are the same instance
+        self.assertTrue( rules )
+        self.assertEqual( len( { id(rule) for rule in rules } ), len( set( rules ) ) )
+        self.assertEqual( rules[0].direction, "egress" )
+
+    def test__05__model__hashes__pass(self):
+        # prepare
+        topology  = get_topology(components=10, nodes=2)
+        templates = topology["topology_template"]["node_templates"]
+        change    = { "topology_template": { "node_templates": { "/Bench/DC/c3": templates["/Bench/DC/c3"] } } }
+
+        # run - test should fail if any exception occurs
+        try:
+            model1 = Model( context="test" )
+            model2 = Model( context="test" )
+            model1.set( get_topology(components=10, nodes=2) )
+            model2.set( topology )
+
+            hashes1 = dict( model2.getHashes() )
+
+            templates["/Bench/DC/c3"]["properties"]["image"] = "centos"
+            model2.set( change )
+
+            hashes2 = dict( model2.getHashes() )
+
+            # compare with a full recalculation
+            model2.dirty = None
+            hashes3 = model2.getHashes()
+
+            delta = Delta( model1, model2 ).getModel()
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check - only the changed component and its parents have new hashes
+        changed = sorted( key for key in hashes1 if hashes1[key] != hashes2[key] )
+        tenant  = delta["vnfs"][0]["tenants"][0]
+
+        self.assertEqual( hashes2, hashes3 )
+        self.assertEqual( changed, [("InternalComponent", "/Bench/DC/c3"), ("Tenant", "/Bench/DC"), ("VNF", "/Bench")] )
+        self.assertEqual( [ c["fqn"] for c in tenant["components"] if c["action"] == "change" ], ["/Bench/DC/c3"] )
+
+    def test__06__model__delta_details__pass(self):
+        # prepare
+        topology  = get_topology(components=3, nodes=1)
+        templates = topology["topology_template"]["node_templates"]
+        templates["/Bench/DC/c1"]["properties"]["image"]          = "centos"
+        templates["/Bench/DC/c1"]["properties"]["sizing"]["max"]  = 3
+        templates["/Bench/DC/oam"]["properties"]["ipv4"]["cidr"]  = "10.9.0.0/16"
+
+        # run - test should fail if any exception occurs
+        try:
+            model1 = Model( context="test" )
+            model2 = Model( context="test" )
+            model1.set( get_topology(components=3, nodes=1) )
+            model2.set( topology )
+
+            summary = Delta( model1, model2 ).getModel()
+            delta   = Delta( model1, model2, details=True ).getModel()
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check
+        tenant     = delta["vnfs"][0]["tenants"][0]
+        components = { component["fqn"]: component for component in tenant["components"] }
+        networks   = { network["fqn"]: network for network in tenant["networks"] }
+
+        self.assertNotIn( "changes", summary["vnfs"][0]["tenants"][0]["components"][-1] )
+        self.assertEqual( components["/Bench/DC/c1"]["changes"][:2],
+                          [ { "path": "/image",      "old": "ubuntu", "new": "centos" },
+                            { "path": "/sizing/max", "old": 1,        "new": 3 } ] )
+        self.assertIn( { "path": "/ipv4/cidr", "old": "10.0.0.0/16", "new": "10.9.0.0/16" },
+                       networks["/Bench/DC/oam"]["changes"] )
+
+    def test__07__model__delta_yaml_values__pass(self):
+        # prepare - metadata with dates and a mapping with keys of different types
+        topology1 = get_topology(components=3, nodes=1)
+        topology2 = get_topology(components=3, nodes=1)
+        for topology, day in [(topology1, 1), (topology2, 2)]:
+            templates = topology["topology_template"]["node_templates"]
+            templates["/Bench/DC/c1"]["properties"]["metadata"] = safe_load( "released: 2018-01-0{}".format(day) )
+            templates["/Bench/DC/c2"]["properties"]["metadata"] = safe_load( "{ 1: one, two: 2 }" )
+
+        # run - test should fail if any exception occurs
+        try:
+            model1 = Model( context="test" )
+            model2 = Model( context="test" )
+            model1.set( topology1 )
+            model2.set( topology2 )
+
+            delta = Delta( model1, model2 ).getModel()
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check
+        tenant = delta["vnfs"][0]["tenants"][0]
+
+        self.assertEqual( [ c["fqn"] for c in tenant["components"] if c["action"] == "change" ], ["/Bench/DC/c1"] )
+        self.assertEqual( [ c["action"] for c in tenant["components"] if c["fqn"] == "/Bench/DC/c2" ], ["keep"] )
+
+    def test__08__model__delta_renamed_component__pass(self):
+        # prepare - a component without nodes which differs only in its fqn
+        topology1 = get_topology(components=1, externals=0)
+        topology2 = get_topology(components=1, externals=0)
+        templates = topology2["topology_template"]["node_templates"]
+        templates["/Bench/DC/c5"] = templates.pop("/Bench/DC/c0")
+        for topology in [topology1, topology2]:
+            for template in topology["topology_template"]["node_templates"].values():
+                if "dependencies" in template["properties"]:
+                    template["properties"]["dependencies"] = []
+
+        # run - test should fail if any exception occurs
+        try:
+            model1 = Model( context="test" )
+            model2 = Model( context="test" )
+            model1.set( topology1 )
+            model2.set( topology2 )
+
+            delta = Delta( model1, model2 ).getModel()
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check
+        components = delta["vnfs"][0]["tenants"][0]["components"]
+
+        self.assertEqual( [ (c["fqn"], c["action"]) for c in components ],
+                          [ ("/Bench/DC/c0", "remove"), ("/Bench/DC/c5", "add") ] )
+
+    def test__09__model__incremental_shared_rules__pass(self):
+        # prepare
+        templates = get_topology(components=20, nodes=2)["topology_template"]["node_templates"]
+
+        # run - test should fail if any exception occurs
+        try:
+            model = Model( context="test" )
+            model.set( get_topology(components=20, nodes=2) )
+
+            # rules of earlier updates must not be kept by the model
+            for index in range(200):
+                templates["/ext0"]["properties"]["ipv4"] = [ "198.51.100.{}/32".format(index) ]
+                model.set( { "topology_template": { "node_templates": { "/ext0": templates["/ext0"] } } } )
+
+            reference = Model( context="test" )
+            reference.set( get_topology(components=20, nodes=2) )
+            reference.set( { "topology_template": { "node_templates": { "/ext0": templates["/ext0"] } } },
+                           incremental=False )
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check
+        self.assertEqual( model._get_interface_rules(), reference._get_interface_rules() )
+        self.assertFalse( hasattr( model, "rules" ) )
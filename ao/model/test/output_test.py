@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from os              import path
+from os              import path, listdir, stat, chmod, umask
+from tempfile        import TemporaryDirectory
 from json            import loads
 from ao.model.output import Output
 from unittest        import TestCase, expectedFailure
@@ -35,3 +36,113 @@ class OutputTest(TestCase):
         self.assertIsNotNone(data)
         self.assertIsNotNone(filenames)
         self.assertIsNotNone(blocks)
+
+    def test__02__model__write_chunks__pass(self):
+        # prepare
+        txt    = OutputTest.parse_text("output.txt")
+        chunks = [ txt[index:index+7] for index in range(0, len(txt), 7) ]
+
+        # run - test should fail if any exception occurs
+        try:
+            with TemporaryDirectory() as directory:
+                stream = Output(directory=directory, keep=True)
+                stream.write(data=iter(chunks))
+
+                blocks    = stream.getBlocks()
+                filenames = stream.getFilenames()
+
+                stream = Output(directory=directory)
+                stream.write(data=iter(chunks))
+
+                retained = stream.getBlocks()
+                with open(path.join(directory, "b.txt")) as file:
+                    content = file.read()
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check
+        self.assertEqual(blocks, ["Hello World", txt.splitlines()[3]])
+        self.assertEqual(filenames, [path.join(directory, "a.txt"), path.join(directory, "b.txt")])
+        self.assertEqual(retained, [])
+        self.assertEqual(content, txt.splitlines()[3])
+
+    def test__03__model__write_update__pass(self):
+        # prepare
+        txt = OutputTest.parse_text("output.txt")
+
+        # run - test should fail if any exception occurs
+        try:
+            with TemporaryDirectory() as directory:
+                stream = Output(directory=directory, update=True, threads=2)
+                stream.write(data=txt)
+                counts1 = (stream.getWritten(), stream.getSkipped())
+
+                with open(path.join(directory, "a.txt"), "w") as file:
+                    file.write("Goodbye World")
+
+                stream.write(data=txt)
+                counts2 = (stream.getWritten(), stream.getSkipped())
+
+                with open(path.join(directory, "a.txt")) as file:
+                    content = file.read()
+                files = sorted(listdir(directory))
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check
+        self.assertEqual(counts1, (2, 0))
+        self.assertEqual(counts2, (1, 1))
+        self.assertEqual(content, "Hello World")
+        self.assertEqual(files, ["a.txt", "b.txt"])
+
+    def test__04__model__write2__pass(self):
+        # run - test should fail if any exception occurs
+        try:
+            with TemporaryDirectory() as directory:
+                stream = Output(directory=directory)
+                stream.write2("a.txt", "Hello\nWorld")
+                blocks = stream.getBlocks()
+
+                stream = Output(directory=directory, keep=True, update=True)
+                stream.write2("a.txt", "Hello\nWorld")
+                stream.write2("b.txt", "Goodbye")
+                counts = (stream.getWritten(), stream.getSkipped())
+
+                with open(path.join(directory, "a.txt")) as file:
+                    content = file.read()
+                files = sorted(listdir(directory))
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check
+        self.assertEqual(blocks, [])
+        self.assertEqual(counts, (1, 1))
+        self.assertEqual(stream.getBlocks(), ["Hello\nWorld", "Goodbye"])
+        self.assertEqual(stream.getFilenames(), [path.join(directory, "a.txt"), path.join(directory, "b.txt")])
+        self.assertEqual(content, "Hello\nWorld")
+        self.assertEqual(files, ["a.txt", "b.txt"])
+
+    def test__05__model__write_update_permissions__pass(self):
+        # prepare
+        txt = OutputTest.parse_text("output.txt")
+
+        # run - test should fail if any exception occurs
+        mask = umask(0o027)
+        try:
+            with TemporaryDirectory() as directory:
+                stream = Output(directory=directory, update=True)
+                stream.write(data=txt)
+                chmod(path.join(directory, "b.txt"), 0o600)
+
+                stream.write(data=txt.replace("Lorem", "Ipsum"))
+                modes = [ stat(path.join(directory, name)).st_mode & 0o777 for name in ["a.txt", "b.txt"] ]
+                files = sorted(listdir(directory))
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+        finally:
+            umask(mask)
+
+        # check - new files follow the umask, replaced files keep their permissions
+        self.assertEqual(stream.getWritten(), 1)
+        self.assertEqual(modes, [0o640, 0o600])
+        self.assertEqual(files, ["a.txt", "b.txt"])
@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from os              import path
+from os              import path, listdir
+from tempfile        import TemporaryDirectory
 from yaml            import safe_load
 from ao.model.render import Render
 from unittest        import TestCase, expectedFailure
@@ -35,3 +36,66 @@ class RenderTest(TestCase):
         self.assertIsNotNone(version)
         self.assertIsNotNone(templates)
         self.assertIsNotNone(result)
+
+    def test__02__render__cache__pass(self):
+        # prepare
+        directory = path.join(path.dirname(__file__),"../../data/templates")
+        data      = RenderTest.parse_yaml("render")
+
+        # run - test should fail if any exception occurs
+        try:
+            with TemporaryDirectory() as cache:
+                render1   = Render(directory=directory, cache=cache)
+                compiled  = dict(render1.renderers)
+                result1   = render1.render( data=data, template_name="action")
+
+                render2   = Render(directory=directory, cache=cache)
+                result2   = render2.render( data=data, template_name="action")
+                unknown   = render2.render( data=data, template_name="unknown")
+
+                entries   = listdir( render2.env.bytecode_cache.directory )
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check
+        self.assertEqual(compiled, {})
+        self.assertEqual(result1, result2)
+        self.assertEqual(unknown, "unknown template")
+        self.assertEqual(len(entries), 1)
+
+    def test__03__render__many__pass(self):
+        # prepare
+        directory = path.join(path.dirname(__file__),"../../data/templates")
+        data      = RenderTest.parse_yaml("render")
+        names     = ["action", "delta", "unknown"]
+
+        # run - test should fail if any exception occurs
+        try:
+            render   = Render(directory=directory)
+            results1 = render.render_many( data=data, template_names=names )
+            results2 = render.render_many( data=data, template_names=names, threads=3 )
+            single   = [ (name, render.render( data=data, template_name=name )) for name in names ]
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check
+        self.assertEqual(results1, single)
+        self.assertEqual(results2, single)
+
+    def test__04__render__generate__pass(self):
+        # prepare
+        directory = path.join(path.dirname(__file__),"../../data/templates")
+        data      = RenderTest.parse_yaml("render")
+
+        # run - test should fail if any exception occurs
+        try:
+            render = Render(directory=directory)
+            chunks = list( render.generate( data=data, template_name="action" ) )
+            result = render.render( data=data, template_name="action" )
+            dump   = "".join( render.generate( data=data ) )
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check
+        self.assertEqual("".join(chunks), result)
+        self.assertEqual(dump, render.render( data=data ))
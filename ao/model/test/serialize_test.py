@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from os                     import path
+from pickle                 import dumps
+from random                 import Random
+from zlib                   import crc32
+from tempfile               import TemporaryDirectory
+from ao.model               import serialize
+from ao.model.model         import Model
+from ao.model.test.topology import get_topology
+from unittest               import TestCase, expectedFailure
+from pytest                 import mark
+
+class SerializeTest(TestCase):
+
+    def test__01__serialize__save_restore__pass(self):
+        # run - test should fail if any exception occurs
+        try:
+            model = Model( context="test" )
+            model.set( get_topology(components=5, nodes=2) )
+
+            with TemporaryDirectory() as directory:
+                filename = path.join(directory, "model.bin")
+                serialize.save( model, filename )
+                restored = serialize.restore( filename )
+
+            data = serialize.dumps( model.getModel() )
+            tree = serialize.loads( data )
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check - the nodes share the rules of their components again
+        component = restored.getModel()["vnfs"][0]["tenants"][0]["components"][0]
+
+        self.assertTrue( data.startswith( b"AOMODEL" ) )
+        self.assertEqual( tree, model.getModel() )
+        self.assertEqual( restored.getModel(), model.getModel() )
+        self.assertIs( component["nodes"][0]["interfaces"][0]["rules"], component["interfaces"][0]["rules"] )
+
+    def test__02__serialize__invalid__pass(self):
+        # prepare
+        model  = Model( context="test" )
+        data   = serialize.dumps( model.getModel() )
+        header = data[:len(serialize.MAGIC) + 2 + len("V0.1.1")]
+        pickled = dumps( { "schema": "V0.1.1", "type": TestCase } )
+
+        # check
+        with self.assertRaises( AttributeError ):
+            serialize.loads( b"---\nschema: V0.1.1\n" )
+        with self.assertRaises( AttributeError ):
+            serialize.loads( data.replace( b"V0.1.1", b"V9.9.9", 1 ) )
+        with self.assertRaises( AttributeError ):
+            serialize.loads( header + crc32( pickled ).to_bytes( 4, "big" ) + pickled )
+        with self.assertRaises( AttributeError ):
+            serialize.loads( data[:-1] )
+        with self.assertRaises( AttributeError ):
+            serialize.loads( data[:len(serialize.MAGIC) + 2] + b"\xff" * len("V0.1.1") + data[len(header):] )
+
+    def test__03__serialize__corrupt__pass(self):
+        # prepare
+        model = Model( context="test" )
+        model.set( get_topology(components=3, nodes=1) )
+        data   = serialize.dumps( model.getModel() )
+        random = Random( 3 )
+
+        # check - corrupt data is rejected with an AttributeError
+        for _ in range(300):
+            corrupt = bytearray( data )
+            for _ in range(3):
+                corrupt[ random.randrange( len(corrupt) ) ] = random.randrange( 256 )
+
+            if corrupt == data:
+                continue
+            with self.assertRaises( AttributeError ):
+                serialize.loads( bytes( corrupt ) )
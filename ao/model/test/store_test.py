@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from os                     import path
+from tempfile               import TemporaryDirectory
+from ao.model.model         import Model
+from ao.model.store         import Store
+from ao.model.test.topology import get_topology
+from unittest               import TestCase, expectedFailure
+from pytest                 import mark
+
+class StoreTest(TestCase):
+
+    def test__01__store__save_load__pass(self):
+        # prepare
+        topology  = get_topology(components=5, nodes=2)
+        templates = topology["topology_template"]["node_templates"]
+        change    = { "topology_template": { "node_templates": { "/Bench/DC/c1": templates["/Bench/DC/c1"] } } }
+
+        # run - test should fail if any exception occurs
+        try:
+            with TemporaryDirectory() as directory:
+                store = Store( path.join(directory, "models.db") )
+
+                model = Model( context="test" )
+                model.set( topology )
+                store.save( model )
+
+                templates["/Bench/DC/c1"]["properties"]["image"] = "centos"
+                model.set( change )
+                store.save( model )
+
+                versions = store.getVersions( "test" )
+                contexts = store.getContexts()
+                latest   = store.load( "test" )
+                first    = store.load( "test", 1 )
+                unknown  = store.load( "unknown" )
+                delta    = store.delta( model, 1 ).getModel()
+                store.close()
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check
+        components = delta["vnfs"][0]["tenants"][0]["components"]
+
+        self.assertEqual( versions, [1, 2] )
+        self.assertEqual( contexts, ["test"] )
+        self.assertIsNone( unknown )
+        self.assertEqual( latest.getModel(), model.getModel() )
+        self.assertEqual( latest.getHashes(), model.getHashes() )
+        self.assertEqual( first.getModel()["version"], 1 )
+        self.assertEqual( [ c["fqn"] for c in components if c["action"] == "change" ], ["/Bench/DC/c1"] )
+
+    def test__02__store__continue__pass(self):
+        # prepare
+        topology  = get_topology(components=5, nodes=1)
+        templates = topology["topology_template"]["node_templates"]
+        change    = { "topology_template": { "node_templates": { "/Bench/DC/c2": templates["/Bench/DC/c2"] } } }
+
+        # run - test should fail if any exception occurs
+        try:
+            with TemporaryDirectory() as directory:
+                store = Store( path.join(directory, "models.db") )
+
+                model = Model( context="test" )
+                model.set( topology )
+                store.save( model )
+
+                templates["/Bench/DC/c2"]["properties"]["dependencies"] = []
+                restored = store.load( "test" )
+                restored.set( change )
+                model.set( change )
+                store.close()
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check - updates of a restored model match updates of the original
+        self.assertEqual( restored.getModel(), model.getModel() )
+
+    def test__03__store__reapply_descriptor__pass(self):
+        # prepare - a descriptor with nodes applied again to the stored model
+        topology = get_topology(components=3, nodes=1)
+
+        # run - test should fail if any exception occurs
+        try:
+            with TemporaryDirectory() as directory:
+                store = Store( path.join(directory, "models.db") )
+
+                model = Model( context="test" )
+                model.set( topology )
+                store.save( model )
+
+                restored = store.load( "test" )
+                restored.set( topology )
+                store.save( restored )
+
+                topology["topology_template"]["node_templates"]["/Bench/DC/c1"]["properties"]["state"] = "stopped"
+                restored = store.load( "test" )
+                restored.set( topology )
+                store.save( restored )
+
+                versions = store.getVersions( "test" )
+                store.close()
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check - the restored model matches a model built from the descriptor
+        fresh = Model( context="test" )
+        fresh.set( topology )
+        component = [ c for c in restored.getModel()["vnfs"][0]["tenants"][0]["components"] if c["fqn"] == "/Bench/DC/c1" ][0]
+
+        self.assertEqual( versions, [1, 2, 3] )
+        self.assertEqual( component["state"], "stopped" )
+        self.assertEqual( restored.getModel()["vnfs"], fresh.getModel()["vnfs"] )
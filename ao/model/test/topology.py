@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------
+#
+# topology.py:
+#
+# Generator for synthetic TOSCA descriptors of arbitrary size which are used
+# as fixtures by the benchmark tests.
+#
+# ------------------------------------------------------------------------------
+
+NETWORKS = ["oam", "m2m1", "m2m2", "svc1"]
+
+# ------------------------------------------------------------------------------
+def get_topology(components=100, nodes=0, externals=2, version="V1.0.0"):
+    """Create a descriptor with a ring of internal components
+
+    Every internal component provides a service on each network and depends
+    on the services of its successor, every external component depends on
+    the first internal component.
+    """
+
+    templates = {}
+
+    templates["/Bench"] = {
+        "type": "tosca.dtag.nodes.VNF",
+        "properties": {
+            "name":        "Bench",
+            "version":     version,
+            "state":       "started",
+            "description": "Benchmark VNF",
+            "vendor":      "Bench"
+        }
+    }
+
+    templates["/Bench/DC"] = {
+        "type": "tosca.dtag.nodes.Tenant",
+        "properties": {
+            "name":        "DC",
+            "version":     version,
+            "state":       "started",
+            "description": "Benchmark tenant",
+            "datacenter":  "DC",
+            "flavors":     [ { "name": "m1.small", "memory": 2048, "disk": 10,
+                               "vcpu": 1, "ephemeral": 0, "public": True, "swap": 0 } ]
+        }
+    }
+
+    for index, name in enumerate(NETWORKS):
+        templates["/Bench/DC/" + name] = {
+            "type": "tosca.dtag.nodes.Network",
+            "properties": {
+                "name":        name,
+                "version":     version,
+                "state":       "started",
+                "description": "Benchmark network",
+                "ipv4":        { "cidr": "10.{}.0.0/16".format(index) },
+                "ipv6":        { "cidr": "2001:db8:{}::/48".format(index) }
+            }
+        }
+
+    for index in range(components):
+        name      = "c{}".format(index)
+        successor = "/Bench/DC/c{}".format((index + 1) % components)
+
+        templates["/Bench/DC/" + name] = {
+            "type": "tosca.dtag.nodes.InternalComponent",
+            "properties": {
+                "name":         name,
+                "version":      version,
+                "state":        "started",
+                "description":  "Benchmark component",
+                "placement":    "EXT",
+                "flavor":       "m1.small",
+                "image":        "ubuntu",
+                "sizing":       { "min": 0, "max": max(nodes, 1), "size": nodes },
+                "interfaces":   [ { "network": network } for network in NETWORKS ],
+                "services":     [ { "name":    "s-" + network,
+                                    "network": network,
+                                    "ports":   [ { "protocol": "TCP", "min": 1000, "max": 1000 } ] }
+                                  for network in NETWORKS ],
+                "dependencies": [ { "service": successor + "/s-" + network, "network": network }
+                                  for network in NETWORKS ]
+            }
+        }
+
+        for number in range(nodes):
+            templates["/Bench/DC/{}/n{}".format(name, number)] = {
+                "type": "tosca.dtag.nodes.Node",
+                "properties": {
+                    "name":       "n{}".format(number),
+                    "version":    version,
+                    "state":      "started",
+                    "interfaces": [ { "network": network } for network in NETWORKS ]
+                }
+            }
+
+    for index in range(externals):
+        templates["/ext{}".format(index)] = {
+            "type": "tosca.dtag.nodes.ExternalComponent",
+            "properties": {
+                "name":         "ext{}".format(index),
+                "version":      version,
+                "state":        "started",
+                "ipv4":         [ "192.0.2.{}/32".format(index) ],
+                "ipv6":         [ "2001:db8::{}/128".format(index) ],
+                "dependencies": [ { "service": "/Bench/DC/c0/s-svc1", "network": "/Bench/DC/svc1" } ] if components else [],
+                "services":     []
+            }
+        }
+
+    return {
+        "tosca_definitions_version": "TOSCA_dtag_profile_for_nfv_0_1_1",
+        "description":               "Benchmark descriptor",
+        "topology_template":         { "node_templates": templates }
+    }
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from os                import path, utime, stat
+from shutil            import copytree
+from tempfile          import TemporaryDirectory
+from unittest.mock     import patch
+from yaml              import safe_load
+from ao.model.validate import Validate
+from jsonschema        import Draft4Validator
+from unittest          import TestCase, expectedFailure
+from pytest            import mark
+
+class ValidateTest(TestCase):
+    @staticmethod
+    def parse_yaml(filename):
+        filepath = path.join(path.dirname(__file__), 'fixtures/{}.yaml'.format(filename))
+        with open(filepath, 'r') as stream:
+            return safe_load(stream.read())
+
+    @staticmethod
+    def schema_dir():
+        return path.join(path.dirname(__file__), "..", "..", "data", "schemas")
+
+    def test__01__validate__lazy_schemas__pass(self):
+        # prepare
+        descriptor = ValidateTest.parse_yaml("clearwater2")
+
+        # run - test should fail if any exception occurs
+        try:
+            validator = Validate(directory=ValidateTest.schema_dir())
+            loaded    = dict(validator.schemas)
+            messages  = validator.validate(descriptor)
+            used      = sorted(validator.schemas)
+            schemas   = validator.getSchemas()
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check
+        self.assertEqual(loaded, {})
+        self.assertEqual(used, ["InternalComponent", "Tosca"])
+        self.assertEqual(len(schemas), 7)
+        self.assertTrue(messages)
+
+    def test__02__validate__schema_cache__pass(self):
+        # prepare
+        descriptor = ValidateTest.parse_yaml("clearwater1")
+
+        # run - test should fail if any exception occurs
+        try:
+            with TemporaryDirectory() as tmp:
+                schema_dir = path.join(tmp, "schemas")
+                cache_dir  = path.join(tmp, "cache")
+                copytree(ValidateTest.schema_dir(), schema_dir)
+
+                messages1 = Validate(directory=schema_dir, cache=cache_dir).validate(descriptor)
+
+                # the cached schemas are used without parsing yaml
+                with patch("ao.model.validate.backend.load", side_effect=AssertionError("parsed")):
+                    messages2 = Validate(directory=schema_dir, cache=cache_dir).validate(descriptor)
+
+                # modified schema files are parsed again
+                schema_file = path.join(schema_dir, "V0.1.1", "Network.yaml")
+                mtime       = stat(schema_file).st_mtime
+                utime(schema_file, (mtime + 10, mtime + 10))
+
+                with patch("ao.model.validate.backend.load", return_value={}) as load:
+                    messages3 = Validate(directory=schema_dir, cache=cache_dir).validate(descriptor)
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check
+        self.assertEqual(messages1, messages2)
+        self.assertEqual(load.call_count, 1)
+        self.assertEqual(messages1, messages3)
+
+    def test__03__validate__parallel__pass(self):
+        # prepare
+        descriptor = ValidateTest.parse_yaml("clearwater1")
+
+        # run - test should fail if any exception occurs
+        try:
+            validator = Validate(directory=ValidateTest.schema_dir())
+            messages1 = validator.validate(descriptor)
+            messages2 = validator.validate(descriptor, jobs=2, chunksize=3)
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check - same messages in the same sequence
+        self.assertTrue(messages1)
+        self.assertEqual(messages1, messages2)
+
+    def test__04__validate__error_budget__pass(self):
+        # prepare
+        descriptor = ValidateTest.parse_yaml("clearwater1")
+        valid_file = path.join(ValidateTest.schema_dir(), "..", "test", "V0.1.1", "clearwater-1.yaml")
+        with open(valid_file, 'r') as stream:
+            valid = safe_load(stream.read())
+
+        # run - test should fail if any exception occurs
+        try:
+            validator = Validate(directory=ValidateTest.schema_dir())
+            messages  = validator.validate(descriptor)
+            first     = validator.validate(descriptor, max_errors=1)
+            budget1   = validator.validate(descriptor, max_errors=5)
+            budget2   = validator.validate(descriptor, max_errors=5, jobs=2, chunksize=2)
+            invalid   = validator.is_valid(descriptor)
+            passed    = validator.is_valid(valid)
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check
+        self.assertEqual(first,   messages[:1])
+        self.assertEqual(budget1, messages[:5])
+        self.assertEqual(budget2, messages[:5])
+        self.assertFalse(invalid)
+        self.assertTrue(passed)
+
+    def test__05__validate__result_cache__pass(self):
+        # prepare
+        descriptor = ValidateTest.parse_yaml("clearwater1")
+        iter_errors = Draft4Validator.iter_errors
+
+        # run - test should fail if any exception occurs
+        try:
+            with TemporaryDirectory() as tmp:
+                results   = path.join(tmp, "results.db")
+                messages1 = Validate(directory=ValidateTest.schema_dir(), results=results).validate(descriptor)
+
+                # unchanged nodes reuse the stored results (only the header is validated)
+                with patch.object(Draft4Validator, "iter_errors", autospec=True, side_effect=iter_errors) as spy:
+                    messages2 = Validate(directory=ValidateTest.schema_dir(), results=results).validate(descriptor)
+                unchanged = spy.call_count
+
+                # only the edited node is validated again
+                descriptor["topology_template"]["node_templates"]["/Clearwater/SOL/bono"]["properties"]["flavor"] = 1
+                with patch.object(Draft4Validator, "iter_errors", autospec=True, side_effect=iter_errors) as spy:
+                    messages3 = Validate(directory=ValidateTest.schema_dir(), results=results).validate(descriptor)
+                changed = spy.call_count
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check
+        self.assertEqual(messages1, messages2)
+        self.assertEqual(unchanged, 1)
+        self.assertEqual(changed,   2)
+        self.assertEqual(len(messages3), len(messages1) + 1)
+
+    def test__06__validate__files__pass(self):
+        # prepare
+        fixtures  = path.join(path.dirname(__file__), "fixtures")
+        filenames = [ path.join(fixtures, name) for name in ["clearwater1.yaml", "clearwater2.yaml", "render.yaml", "missing.yaml"] ]
+        filenames.append( path.join(ValidateTest.schema_dir(), "..", "test", "V0.1.1", "clearwater-1.yaml") )
+
+        # run - test should fail if any exception occurs
+        try:
+            validator = Validate(directory=ValidateTest.schema_dir())
+            results1  = validator.validate_files(filenames)
+            results2  = validator.validate_files(filenames, jobs=2)
+        except Exception as exc:
+            self.fail("Failed with {}".format(str(exc)))
+
+        # check
+        for result in results1 + results2:
+            del result["seconds"]
+
+        self.assertEqual(results1, results2)
+        self.assertEqual([result["status"] for result in results1], ["invalid", "invalid", "error", "unreadable", "valid"])
+        self.assertEqual(results1[0]["messages"], validator.validate(ValidateTest.parse_yaml("clearwater1")))
@@ -7,12 +7,38 @@
 #
 # A class to provide functionality for validating data.
 #
+# jsonschema is imported when the first schema is compiled.
+#
 # ------------------------------------------------------------------------------
 
-import yaml
-import glob
+from ao.model       import backend
+from ao.model.cache import Cache
+from ao.model.input import Input
+import hashlib
+import json
 import os
-import jsonschema
+import time
+from functools          import lru_cache
+
+# ------------------------------------------------------------------------------
+# version of the validation library (part of the keys of cached results)
+# ------------------------------------------------------------------------------
+@lru_cache(maxsize=None)
+def jsonschema_version():
+    from importlib.metadata import version as package_version
+
+    try:
+        return package_version( "jsonschema" )
+    except Exception:
+        return "unknown"
+
+# ------------------------------------------------------------------------------
+# messages
+# ------------------------------------------------------------------------------
+MISSING_TYPE     = "/topology_template/node_templates/{}: 'type' is a required property"
+UNKNOWN_TYPE     = "/topology_template/node_templates/{}: unknown type: {}"
+MISSING_PROPERTY = "/topology_template/node_templates/{}: 'properties' is a required property"
+OTHER_ERROR      = "/topology_template/node_templates/'{}'/properties{}: {}"
 
 # ------------------------------------------------------------------------------
 #
@@ -22,50 +48,33 @@ import jsonschema
 class Validate():
 
     # --------------------------------------------------------------------------
-    def __init__(self, version="V0.1.1", directory=None):
-        """Initialize"""
+    def __init__(self, version="V0.1.1", directory=None, cache=None, results=None):
+        """Initialize (schemas are loaded on demand)"""
 
         if directory is None:
             self.directory = os.path.dirname(__file__)
         else:
             self.directory = directory
         self.version    = version
+        self.cache      = cache
         self.schemas    = {}
         self.validators = {}
-
-        # load schemas
-        for schema_file in glob.glob( '{}/{}/*.yaml'.format( self.directory, self.version ) ):
-            schema_name = os.path.basename( schema_file )[:-5]
-            with open( schema_file, 'r' ) as stream:
-                schema    = yaml.safe_load( stream )
-                validator = jsonschema.Draft4Validator( schema )
-
-                self.schemas[schema_name]    = schema
-                self.validators[schema_name] = validator
+        self.hashes     = {}
+        self.cached     = None
+        self.results    = Cache( results ) if results else None
 
     # --------------------------------------------------------------------------
-    def validate(self, data):
-        """Validate data against a schema"""
-        missing_type     = "/topology_template/node_templates/{}: 'type' is a required property"
-        unknown_type     = "/topology_template/node_templates/{}: unknown type: {}"
-        missing_property = "/topology_template/node_templates/{}: 'properties' is a required property"
-        other_error      = "/topology_template/node_templates/'{}'/properties{}: {}"
+    def validate(self, data, jobs=1, chunksize=None, max_errors=None):
+        """Validate data against a schema (stop after max_errors messages)"""
         messages = []
 
         # validate TOSCA header
-        validator = self.validators[ "Tosca" ]
+        validator = self._get_validator( "Tosca" )
 
         for error in validator.iter_errors(data):
-            path = ""
-            for entry in error.absolute_path:
-                if isinstance( entry, int ):
-                    path = path + "[" + str(entry) + "]"
-                else:
-                    path = path + "/" + str(entry)
-            if path == "":
-                path="/"
-
-            messages.append( path  + ": " + error.message)
+            messages.append( self._get_path(error) + ": " + error.message)
+            if max_errors and len(messages) >= max_errors:
+                return messages
 
         # check if template has any nodes
         templates = data["topology_template"]["node_templates"]
@@ -73,45 +82,303 @@ class Validate():
             return messages
 
         # validate nodes of the TOSCA template
-        for uuid, node in templates.items():
+        nodes = list( templates.items() )
+        limit = max_errors - len(messages) if max_errors else None
+
+        if jobs > 1 and len(nodes) > 1:
+            messages.extend( self._validate_parallel( nodes, jobs, chunksize, limit ) )
+        else:
+            messages.extend( self._validate_nodes( nodes, limit ) )
+
+        if self.results:
+            self.results.flush()
+
+        return messages
+
+    # --------------------------------------------------------------------------
+    def is_valid(self, data):
+        """Check if data is valid without collecting any messages"""
+
+        # validate TOSCA header
+        if not self._get_validator( "Tosca" ).is_valid(data):
+            return False
+
+        # validate nodes of the TOSCA template
+        templates = data["topology_template"]["node_templates"]
+        if not templates:
+            return True
+
+        for node in templates.values():
+            if not "type" in node or not "properties" in node:
+                return False
+
+            validator = self._get_validator( node["type"].rsplit(".", 1)[-1] )
+            if validator is None or not validator.is_valid( node["properties"] ):
+                return False
+
+        return True
+
+    # --------------------------------------------------------------------------
+    def validate_files(self, filenames, jobs=1, max_errors=None):
+        """Validate many descriptor files and provide a result per file"""
+
+        if jobs > 1 and len(filenames) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor( max_workers=jobs,
+                                      initializer=_init_worker,
+                                      initargs=(self.version, self.directory, self.cache,
+                                                self.results.getFilename() if self.results else None) ) as executor:
+                # results are returned in the sequence of the files
+                return list( executor.map( _validate_file, filenames, [max_errors] * len(filenames) ) )
+
+        return [ self._validate_file( filename, max_errors ) for filename in filenames ]
+
+    # --------------------------------------------------------------------------
+    def _validate_file(self, filename, max_errors=None):
+        """Validate a descriptor file"""
+        start  = time.perf_counter()
+        result = {
+            "file":     filename,
+            "status":   "valid",
+            "errors":   0,
+            "messages": []
+        }
+
+        try:
+            descriptor = Input(keep=False).read(filename=filename)
+
+            if descriptor is None:
+                result["status"]   = "unreadable"
+                result["messages"] = [ "unable to read descriptor" ]
+            elif max_errors == 0:
+                if not self.is_valid( descriptor ):
+                    result["status"] = "invalid"
+            else:
+                result["messages"] = self.validate( descriptor, max_errors=max_errors )
+                if result["messages"]:
+                    result["status"] = "invalid"
+        except Exception as exc:
+            result["status"]   = "error"
+            result["messages"] = [ "{}".format(exc) ]
+
+        result["errors"]  = len( result["messages"] )
+        result["seconds"] = round( time.perf_counter() - start, 6 )
+
+        return result
+
+    # --------------------------------------------------------------------------
+    def _validate_parallel(self, nodes, jobs, chunksize=None, limit=None):
+        """Validate batches of nodes in a pool of worker processes"""
+
+        if chunksize is None:
+            chunksize = max( 1, -(-len(nodes) // (jobs * 4)) )
+
+        chunks = [ (nodes[index:index+chunksize], limit) for index in range(0, len(nodes), chunksize) ]
 
-            # check if type has been defined
-            if not "type" in node:
-                messages.append( missing_type.format(uuid) )
-                continue
+        from concurrent.futures import ProcessPoolExecutor
 
-            # check validity of type
-            type = node["type"].rsplit(".", 1)[-1]
-            if not type in self.schemas:
-                messages.append( unknown_type.format(uuid,type) )
-                continue
+        messages = []
+        executor = ProcessPoolExecutor( max_workers=jobs,
+                                        initializer=_init_worker,
+                                        initargs=(self.version, self.directory, self.cache,
+                                                  self.results.getFilename() if self.results else None) )
+        try:
+            # results are returned in the sequence of the chunks
+            for result in executor.map( _validate_chunk, chunks ):
+                messages.extend( result )
+                if limit and len(messages) >= limit:
+                    break
+        finally:
+            # drop all pending batches once the error budget has been used up
+            executor.shutdown( wait=True, cancel_futures=True )
+
+        return messages[:limit] if limit else messages
+
+    # --------------------------------------------------------------------------
+    def _validate_nodes(self, nodes, limit=None):
+        """Validate a list of (uuid, node) tuples"""
+        messages = []
+
+        for uuid, node in nodes:
+            messages.extend( self._validate_node( uuid, node, limit and limit - len(messages) ) )
+            if limit and len(messages) >= limit:
+                break
+
+        return messages
 
-            # check if properties has been defined
-            if not "properties" in node:
-                messages.append( missing_property.format(uuid) )
-                continue
+    # --------------------------------------------------------------------------
+    def _validate_node(self, uuid, node, limit=None):
+        """Validate a single node template"""
+        messages = []
 
-            # validate properties against schema
-            properties = node["properties"]
+        # check if type has been defined
+        if not "type" in node:
+            messages.append( MISSING_TYPE.format(uuid) )
+            return messages
 
-            # get schema
-            validator = self.validators[ type ]
+        # check validity of type
+        type = node["type"].rsplit(".", 1)[-1]
+        validator = self._get_validator( type )
+        if validator is None:
+            messages.append( UNKNOWN_TYPE.format(uuid,type) )
+            return messages
+
+        # check if properties has been defined
+        if not "properties" in node:
+            messages.append( MISSING_PROPERTY.format(uuid) )
+            return messages
 
-            # validate properties
+        # validate properties against schema (or reuse a previous result)
+        properties = node["properties"]
+
+        key    = self._get_result_key( type, properties )
+        errors = self.results.get( key ) if key else None
+
+        if errors is None:
+            errors = []
             for error in validator.iter_errors(properties):
-                path = ""
-                for entry in error.absolute_path:
-                    if isinstance( entry, int ):
-                        path = path + "[" + str(entry) + "]"
-                    else:
-                        path = path + "/" + str(entry)
-                if path == "":
-                    path="/"
+                errors.append( [ self._get_path(error), error.message ] )
+                if limit and len(errors) >= limit:
+                    break
+            else:
+                # only complete results can be reused
+                if key:
+                    self.results.set( key, errors )
 
-                messages.append( other_error.format(uuid,path,error.message) )
+        for path, message in errors[:limit]:
+            messages.append( OTHER_ERROR.format(uuid,path,message) )
 
         return messages
 
+    # --------------------------------------------------------------------------
+    def _get_result_key(self, type, properties):
+        """Provide a stable hash of a node template and its schema"""
+
+        if not self.results:
+            return None
+
+        try:
+            content = json.dumps( properties, sort_keys=True, default=str )
+        except TypeError:
+            return None
+
+        # hash of the schema (and version of the validation library)
+        if not type in self.hashes:
+            schema = json.dumps( [ jsonschema_version(), self.version, self.schemas[type] ],
+                                 sort_keys=True, default=str )
+            self.hashes[type] = hashlib.sha256( schema.encode("utf-8") ).hexdigest()
+
+        key = "\0".join( [ self.hashes[type], type, content ] )
+
+        return hashlib.sha256( key.encode("utf-8") ).hexdigest()
+
+    # --------------------------------------------------------------------------
+    def _get_path(self, error):
+        """Provide the path of a validation error"""
+        path = ""
+        for entry in error.absolute_path:
+            if isinstance( entry, int ):
+                path = path + "[" + str(entry) + "]"
+            else:
+                path = path + "/" + str(entry)
+        if path == "":
+            path="/"
+
+        return path
+
+    # --------------------------------------------------------------------------
+    def _get_validator(self, schema_name):
+        """Provide the validator for a schema (None if unknown)"""
+
+        if not schema_name in self.validators:
+            schema = self._load_schema( schema_name )
+            if schema is None:
+                return None
+
+            import jsonschema
+
+            self.schemas[schema_name]    = schema
+            self.validators[schema_name] = jsonschema.Draft4Validator( schema )
+
+        return self.validators[schema_name]
+
+    # --------------------------------------------------------------------------
+    def _load_schema(self, schema_name):
+        """Load a schema from the cache or the schema file"""
+
+        if not schema_name or os.sep in schema_name:
+            return None
+
+        schema_file = os.path.join( self.directory, self.version, schema_name + ".yaml" )
+        try:
+            stat = os.stat( schema_file )
+        except OSError:
+            return None
+
+        # reuse the parsed schema if the file has not been modified
+        stamp  = [ stat.st_mtime_ns, stat.st_size ]
+        cached = self._get_cached_schemas()
+        entry  = cached.get( schema_name )
+        if entry and entry["stamp"] == stamp:
+            return entry["schema"]
+
+        with open( schema_file, 'r' ) as stream:
+            schema = backend.load( stream )
+
+        cached[schema_name] = { "stamp": stamp, "schema": schema }
+        self._write_cached_schemas()
+
+        return schema
+
+    # --------------------------------------------------------------------------
+    def _get_cache_file(self):
+        """Provide the name of the cache file for the schema directory"""
+
+        if not self.cache:
+            return None
+
+        key = os.path.abspath( os.path.join( self.directory, self.version ) )
+        key = hashlib.sha1( key.encode("utf-8") ).hexdigest()[:16]
+
+        return os.path.join( self.cache, "schemas-{}-{}.json".format( self.version, key ) )
+
+    # --------------------------------------------------------------------------
+    def _get_cached_schemas(self):
+        """Read the parsed schemas from the cache file"""
+
+        if self.cached is None:
+            self.cached = {}
+
+            cache_file = self._get_cache_file()
+            if cache_file:
+                try:
+                    with open( cache_file, 'r' ) as stream:
+                        self.cached = json.load( stream )
+                except (OSError, ValueError):
+                    self.cached = {}
+
+        return self.cached
+
+    # --------------------------------------------------------------------------
+    def _write_cached_schemas(self):
+        """Write the parsed schemas to the cache file"""
+
+        cache_file = self._get_cache_file()
+        if not cache_file:
+            return
+
+        try:
+            os.makedirs( self.cache, exist_ok=True )
+
+            # replace the cache file atomically
+            temp_file = "{}.{}.tmp".format( cache_file, os.getpid() )
+            with open( temp_file, 'w' ) as stream:
+                json.dump( self.cached, stream )
+            os.replace( temp_file, cache_file )
+        except (OSError, TypeError, ValueError):
+            pass
+
     # --------------------------------------------------------------------------
     def getDirectory(self):
         """Provide directory"""
@@ -122,7 +389,43 @@ class Validate():
         """Provide version"""
         return self.version
 
+    # --------------------------------------------------------------------------
+    def getCache(self):
+        """Provide cache directory"""
+        return self.cache
+
+    # --------------------------------------------------------------------------
+    def getResults(self):
+        """Provide cache of validation results"""
+        return self.results
+
     # --------------------------------------------------------------------------
     def getSchemas(self):
         """Provide schemas"""
+        for schema_file in os.listdir( os.path.join( self.directory, self.version ) ):
+            if schema_file.endswith(".yaml"):
+                self._get_validator( schema_file[:-5] )
         return self.schemas
+
+# ------------------------------------------------------------------------------
+#
+# Worker processes for the parallel validation
+#
+# ------------------------------------------------------------------------------
+_worker = None
+
+def _init_worker(version, directory, cache, results):
+    global _worker
+    _worker = Validate(version=version, directory=directory, cache=cache, results=results)
+
+def _validate_file(filename, max_errors):
+    return _worker._validate_file(filename, max_errors)
+
+def _validate_chunk(chunk):
+    nodes, limit = chunk
+    messages     = _worker._validate_nodes(nodes, limit)
+
+    if _worker.results:
+        _worker.results.flush()
+
+    return messages
@@ -22,7 +22,8 @@ setup(
         'console_scripts': [
             'splitter=ao.cli.splitter:main',
             'generator=ao.cli.generator:main',
-            'validator=ao.cli.validator:main'
+            'validator=ao.cli.validator:main',
+            'service=ao.cli.service:main'
         ]
     },
     package_dir          = {"ao": "ao" },